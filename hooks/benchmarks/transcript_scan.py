@@ -0,0 +1,175 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "orjson",
+# ]
+# ///
+"""
+Benchmark a cold transcript index scan against decoding every line.
+
+Generates a transcript with Claude Code's record mix (35% tool results, 25% text,
+30% tool_use, 10% system), then times hooklib.transcript.scan() on it with an empty
+index directory, next to the reader it replaced, which split every chunk into lines
+and decoded all of them. Both must collect identical Read/Write/tool_use id sets.
+
+Usage:
+    uv run hooks/benchmarks/transcript_scan.py [--size-mb 50] [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "post-tool-use"))
+
+from hooklib import transcript
+
+RECORD_MIX = (("tool_result", 35), ("text", 25), ("tool_use", 30), ("system", 10))
+TOOL_NAMES = ("Read", "Edit", "Write", "Bash", "Grep", "MultiEdit")
+
+
+def generate(path: Path, size_bytes: int, seed: int = 0) -> None:
+    """Write a transcript of roughly size_bytes; the same seed gives the same file."""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in RECORD_MIX]
+    weights = [weight for _, weight in RECORD_MIX]
+    filler = "lorem ipsum dolor sit amet " * 400
+
+    written = 0
+    with open(path, "wb") as f:
+        while written < size_bytes:
+            record = _record(rng.choices(kinds, weights)[0], rng, filler, written)
+            line = orjson.dumps(record) + b"\n"
+            f.write(line)
+            written += len(line)
+
+
+def _record(kind: str, rng: random.Random, filler: str, serial: int) -> dict[str, object]:
+    match kind:
+        case "tool_result":
+            content = filler[: rng.randint(1000, 8000)]
+            return {
+                "type": "user",
+                "message": {
+                    "role": "user",
+                    "content": [{"type": "tool_result", "tool_use_id": f"toolu_{serial}", "content": content}],
+                },
+            }
+        case "text":
+            return {
+                "type": "assistant",
+                "message": {
+                    "role": "assistant",
+                    "content": [{"type": "text", "text": filler[: rng.randint(200, 2000)]}],
+                },
+            }
+        case "tool_use":
+            name = rng.choice(TOOL_NAMES)
+            tool_input: dict[str, object] = {"file_path": f"/project/src/module_{rng.randint(0, 5000)}.py"}
+            if name in ("Edit", "MultiEdit"):
+                tool_input |= {"old_string": filler[:200], "new_string": filler[:240]}
+            elif name == "Bash":
+                tool_input = {"command": "pytest -q"}
+            return {
+                "type": "assistant",
+                "message": {
+                    "role": "assistant",
+                    "content": [{"type": "tool_use", "id": f"toolu_{serial}", "name": name, "input": tool_input}],
+                },
+            }
+        case _:
+            return {"type": "system", "subtype": "info", "content": filler[: rng.randint(100, 600)]}
+
+
+def scan_cold(path: Path) -> transcript.TranscriptSummary:
+    """Index the whole transcript with an empty sidecar directory."""
+    with tempfile.TemporaryDirectory() as index_dir:
+        transcript.INDEX_DIR = Path(index_dir)
+        transcript._loaded.clear()
+        return transcript.scan(path, session_id="benchmark")
+
+
+def scan_decode_all(path: Path) -> transcript.TranscriptSummary:
+    """The previous reader: split each chunk into lines and decode every one of them."""
+    read_paths: set[str] = set()
+    written_paths: set[str] = set()
+    tool_use_ids: set[str] = set()
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        carry = b""
+        position = len(mapped)
+        while position > 0:
+            chunk_start = max(0, position - transcript.CHUNK_SIZE)
+            lines = (mapped[chunk_start:position] + carry).split(b"\n")
+            carry = lines.pop(0) if chunk_start > 0 else b""
+            for line in lines:
+                if not line.strip():
+                    continue
+                entry = orjson.loads(line)
+                if entry.get("type") != "assistant":
+                    continue
+                for block in entry["message"]["content"]:
+                    if block.get("type") != "tool_use":
+                        continue
+                    tool_use_ids.add(block["id"])
+                    match block["name"]:
+                        case "Read":
+                            read_paths.add(block["input"]["file_path"])
+                        case "Write" | "Edit" | "MultiEdit" | "NotebookEdit":
+                            written_paths.add(block["input"]["file_path"])
+            position = chunk_start
+
+    return transcript.TranscriptSummary(frozenset(read_paths), frozenset(written_paths), frozenset(tool_use_ids))
+
+
+def median_ms(
+    scan: Callable[[Path], transcript.TranscriptSummary], path: Path, runs: int
+) -> tuple[float, transcript.TranscriptSummary]:
+    timings: list[float] = []
+    summary = transcript.EMPTY_SUMMARY
+    for _ in range(runs):
+        started = time.perf_counter()
+        summary = scan(path)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = Path(work_dir) / "transcript.jsonl"
+        generate(path, args.size_mb * 1024 * 1024)
+
+        before_ms, before = median_ms(scan_decode_all, path, args.runs)
+        after_ms, after = median_ms(scan_cold, path, args.runs)
+
+    print(f"Cold scan of a {args.size_mb} MB transcript, median of {args.runs}:")
+    print(f"  decode every line  {before_ms:6.0f} ms")
+    print(f"  marker prefilter   {after_ms:6.0f} ms")
+    if before != after:
+        print("Result sets differ", file=sys.stderr)
+        return 1
+    print(
+        f"Identical results: {len(after.read_paths)} read, {len(after.written_paths)} written, "
+        f"{len(after.tool_use_ids)} tool_use ids"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
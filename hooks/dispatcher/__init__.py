@@ -0,0 +1,12 @@
+"""Runtime support for the PostToolUse dispatcher (hooks/post_tool_use.py)."""
+
+import sys
+from pathlib import Path
+
+# Hook scripts and their shared hooklib package live next to the dispatcher
+HOOK_DIR = Path(__file__).resolve().parent.parent / "post-tool-use"
+# The language rules and their loader (load_rules) live at the top of the repository
+RULES_DIR = Path(__file__).resolve().parent.parent.parent / "rules"
+for _path in (HOOK_DIR, RULES_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
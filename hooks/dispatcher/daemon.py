@@ -0,0 +1,315 @@
+"""
+Long-lived PostToolUse daemon that keeps hook scripts loaded between tool calls.
+
+The daemon imports every Python hook module once, together with its dependencies,
+and then forks a worker pool that calls each hook's `run(payload)` entry point, so
+a request only pays for running the checks themselves.
+`post_tool_use.py` talks to it over a Unix socket and falls back to spawning the
+hooks itself whenever the daemon is unreachable.
+
+Usage:
+    uv run ~/.claude/hooks/post_tool_use.py --daemon
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import socket
+import sys
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import NoReturn
+
+from hooklib.context import HookContext
+
+from dispatcher import HOOK_DIR, RULES_DIR, inprocess, sharedenv
+
+SOCKET_PATH = Path(os.environ.get("POST_TOOL_USE_SOCKET", Path.home() / ".claude" / "run" / "post-tool-use.sock"))
+CONNECT_TIMEOUT_SECONDS = 0.5
+# How long a client waits for a reply beyond the dispatch budget before dispatching itself
+RESPONSE_MARGIN_SECONDS = 15.0
+IDLE_TIMEOUT_SECONDS = 30 * 60
+HOOK_TIMEOUT_SECONDS = 30.0
+
+HookOutcome = inprocess.HookOutcome
+# (command, stdin, context, cwd, in_process); in_process=False forces a killable subprocess
+HookExecutor = Callable[[str, str, HookContext | None, str, bool], Awaitable[HookOutcome]]
+DispatchFn = Callable[[str, str | None, HookExecutor], Awaitable[tuple[int, str]]]
+FallbackExecutor = Callable[[str, str, str, dict[str, str], str | None], Awaitable[HookOutcome]]
+ScriptResolver = Callable[[str], Path | None]
+
+
+def request_dispatch(
+    stdin_data: str, tool_name: str | None, budget_seconds: float, socket_path: Path = SOCKET_PATH
+) -> tuple[int, str] | None:
+    """Forward one PostToolUse invocation to the daemon.
+
+    Args:
+        stdin_data: The PostToolUse payload
+        tool_name: Tool name given on the command line, if any
+        budget_seconds: The dispatch time budget; a daemon that has not replied
+            RESPONSE_MARGIN_SECONDS after it is treated as wedged
+
+    Returns:
+        Tuple of (exit_code, stderr), or None if the daemon could not serve the request
+    """
+    request = json.dumps({"stdin": stdin_data, "tool_name": tool_name, "env": dict(os.environ)}).encode()
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT_SECONDS)
+            client.connect(str(socket_path))
+            client.settimeout(budget_seconds + RESPONSE_MARGIN_SECONDS)
+            client.sendall(request)
+            client.shutdown(socket.SHUT_WR)
+
+            chunks: list[bytes] = []
+            while chunk := client.recv(65536):
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    try:
+        response = json.loads(b"".join(chunks))
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(response, dict) or "exit_code" not in response:
+        return None
+
+    return int(response["exit_code"]), str(response.get("stderr", ""))
+
+
+def serve(
+    dispatch: DispatchFn,
+    hook_scripts: list[Path],
+    resolve_script: ScriptResolver,
+    fallback: FallbackExecutor,
+    socket_path: Path = SOCKET_PATH,
+) -> int:
+    """Preload hook scripts and serve dispatch requests until idle.
+
+    When a hook, the dispatcher, the shared hooklib, the rules loader or a rule file changes,
+    the daemon re-executes itself so the next request is served by the new code.
+    """
+    watched_files = [
+        *hook_scripts,
+        *Path(__file__).parent.glob("*.py"),
+        *(HOOK_DIR / "hooklib").glob("*.py"),
+        RULES_DIR,
+        RULES_DIR / "load_rules.py",
+        *RULES_DIR.glob("*.json"),
+        Path(sys.argv[0]).resolve(),
+        sharedenv.HOOK_ENV_DIR / "stamp.json",
+    ]
+    started_mtimes = _snapshot_mtimes(watched_files)
+
+    preloaded = [script for script in hook_scripts if inprocess.load_hook(script) is not None]
+
+    loaded = ", ".join(script.name for script in preloaded) or "none"
+    print(f"[post-tool-use-daemon] Preloaded hooks: {loaded}", file=sys.stderr)
+
+    if asyncio.run(_serve(dispatch, resolve_script, fallback, socket_path, watched_files, started_mtimes)):
+        _restart()
+    return 0
+
+
+def _restart() -> NoReturn:
+    """Replace this process with a fresh daemon that imports the changed sources."""
+    print("[post-tool-use-daemon] Hook sources changed, restarting", file=sys.stderr)
+    # Let the new daemon pick up a rebuilt shared environment as well
+    os.environ.pop("POST_TOOL_USE_REEXEC", None)
+    os.execv(sys.executable, [sys.executable, *sys.argv])
+
+
+async def _serve(
+    dispatch: DispatchFn,
+    resolve_script: ScriptResolver,
+    fallback: FallbackExecutor,
+    socket_path: Path,
+    watched_files: list[Path],
+    started_mtimes: dict[Path, int],
+) -> bool:
+    """Serve until idle or until a watched source changes.
+
+    Returns:
+        True if the daemon stopped because its sources changed and should restart
+    """
+    pool: ProcessPoolExecutor | None = _create_pool()
+    active_dispatches = 0
+    sources_changed = False
+    stop = asyncio.Event()
+    activity = asyncio.Event()
+
+    def retire_pool(stale: ProcessPoolExecutor) -> None:
+        """Kill a pool whose worker is stuck or broken; hooks fall back to subprocesses until it is replaced."""
+        nonlocal pool
+        if pool is stale:
+            pool = None
+            _terminate_pool(stale)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal pool, active_dispatches, sources_changed
+        activity.set()
+
+        try:
+            request = json.loads(await reader.read())
+            stdin_data: str = request["stdin"]
+            tool_name: str | None = request.get("tool_name")
+            client_env: dict[str, str] = request["env"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            await _respond(writer, {"error": "invalid request"})
+            return
+
+        if _snapshot_mtimes(watched_files) != started_mtimes:
+            sources_changed = True
+            await _respond(writer, {"error": "hook sources changed, daemon restarting"})
+            stop.set()
+            activity.set()
+            return
+
+        async def execute(
+            command: str, hook_stdin: str, context: HookContext | None, cwd: str, in_process: bool = True
+        ) -> HookOutcome:
+            payload_path = context.payload_path if context is not None else None
+            script = resolve_script(command)
+            current = pool
+            if (
+                not in_process
+                or current is None
+                or script is None
+                or context is None
+                or inprocess.load_hook(script) is None
+            ):
+                return await fallback(command, hook_stdin, cwd, client_env, payload_path)
+
+            try:
+                task = current.submit(_run_loaded_hook, script, context, cwd, client_env)
+                return await asyncio.wait_for(asyncio.wrap_future(task), timeout=HOOK_TIMEOUT_SECONDS)
+            except TimeoutError:
+                # The worker is still inside the hook and would hold its slot forever
+                retire_pool(current)
+                return 1, "", "Hook execution timed out"
+            except asyncio.CancelledError:
+                # Out of budget or cancelled under fail_fast; a hook already running keeps its worker busy
+                if not task.cancel() and not task.done():
+                    retire_pool(current)
+                raise
+            except BrokenProcessPool:
+                retire_pool(current)
+                return await fallback(command, hook_stdin, cwd, client_env, payload_path)
+
+        active_dispatches += 1
+        try:
+            exit_code, stderr = await dispatch(stdin_data, tool_name, execute)
+        except Exception as e:
+            response: dict[str, object] = {"error": f"dispatch failed: {e}"}
+        else:
+            response = {"exit_code": exit_code, "stderr": stderr}
+        finally:
+            active_dispatches -= 1
+
+        await _respond(writer, response)
+
+        # Forking while hook subprocesses run would leak their pipes into the new workers
+        if pool is None and active_dispatches == 0:
+            pool = _create_pool()
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    server = await asyncio.start_unix_server(handle, path=str(socket_path))
+    os.chmod(socket_path, 0o600)
+    print(f"[post-tool-use-daemon] Listening on {socket_path}", file=sys.stderr)
+
+    try:
+        while not stop.is_set():
+            activity.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(activity.wait(), timeout=IDLE_TIMEOUT_SECONDS)
+                continue
+            break
+    finally:
+        server.close()
+        await server.wait_closed()
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+        if pool is not None:
+            _terminate_pool(pool)
+
+    return sources_changed
+
+
+async def _respond(writer: asyncio.StreamWriter, payload: dict[str, object]) -> None:
+    writer.write(json.dumps(payload).encode())
+    with contextlib.suppress(ConnectionError):
+        await writer.drain()
+    writer.close()
+    # Fully closed before any later fork, so no pool worker inherits the client's connection
+    with contextlib.suppress(ConnectionError):
+        await writer.wait_closed()
+
+
+def _create_pool() -> ProcessPoolExecutor:
+    """Create a worker pool that inherits the preloaded hook modules via fork.
+
+    Workers are started eagerly: forking them later, while hook subprocesses are
+    running, would leak those subprocesses' pipe ends into the workers and keep
+    `communicate()` waiting until the hook timeout.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor()
+    pool.submit(int).result()
+    return pool
+
+
+def _terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut a pool down without waiting, killing workers that are still busy or idle.
+
+    Forked workers would otherwise outlive a re-exec or keep running an overrunning
+    hook. ProcessPoolExecutor only gained a public kill_workers() in Python 3.14.
+    """
+    workers = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for worker in workers:
+        with contextlib.suppress(OSError, ValueError):
+            worker.kill()
+            worker.join(1)
+
+
+def _snapshot_mtimes(paths: list[Path]) -> dict[Path, int]:
+    mtimes: dict[Path, int] = {}
+    for path in paths:
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except OSError:
+            mtimes[path] = -1
+    return mtimes
+
+
+def _run_loaded_hook(script: Path, context: HookContext, cwd: str, env: dict[str, str]) -> HookOutcome:
+    """Run a preloaded hook in a pool worker with the client's cwd and environment."""
+    module = inprocess.load_hook(script)
+    if module is None:
+        return 1, "", f"Hook execution failed: {script.name} is not loaded"
+
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    try:
+        inprocess.enter_hook_environment(cwd, env)
+        return inprocess.call_hook(module, context)
+    except Exception as e:
+        return 1, "", f"Hook execution failed: {e}"
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
@@ -0,0 +1,103 @@
+"""
+In-process execution of PostToolUse hooks.
+
+Python hooks expose `run(context) -> HookResult` (see hooks/post-tool-use/hooklib).
+Loading them as modules lets the dispatcher call that entry point directly instead
+of spawning `uv run <hook>.py` for every tool call. Hooks whose dependencies are
+not importable here simply stay on the subprocess path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib.util
+import os
+import sys
+import threading
+import types
+from collections.abc import Mapping
+from pathlib import Path
+
+from hooklib.context import HookContext
+
+HookOutcome = tuple[int, str, str]
+
+_LOADED_HOOKS: dict[Path, types.ModuleType | None] = {}
+
+
+def load_hook(script: Path) -> types.ModuleType | None:
+    """Import a hook script as a module, once per process.
+
+    Returns:
+        The hook module, or None if it cannot be imported or has no `run` entry point
+    """
+    if script in _LOADED_HOOKS:
+        return _LOADED_HOOKS[script]
+
+    hook_dir = str(script.parent)
+    if hook_dir not in sys.path:
+        sys.path.insert(0, hook_dir)
+
+    module_name = f"_hook_{script.stem}"
+    spec = importlib.util.spec_from_file_location(module_name, script)
+    module: types.ModuleType | None = None
+    if spec is not None and spec.loader is not None:
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[module_name]
+            module = None
+
+    if module is not None and not callable(getattr(module, "run", None)):
+        module = None
+
+    _LOADED_HOOKS[script] = module
+    return module
+
+
+def enter_hook_environment(cwd: str, env: Mapping[str, str] | None = None) -> None:
+    """Give this process the cwd and environment a spawned hook would have had."""
+    if env is not None:
+        os.environ.clear()
+        os.environ.update(env)
+    os.environ["POST_TOOL_USE_RUNNING"] = "1"
+    os.environ["CLAUDE_CODE_CWD"] = cwd
+    os.chdir(cwd)
+
+
+def call_hook(module: types.ModuleType, context: HookContext) -> HookOutcome:
+    """Call a loaded hook's `run` entry point and unpack its HookResult."""
+    returncode, stdout, stderr = module.run(context)
+    return returncode, stdout, stderr
+
+
+async def run_hook_in_thread(module: types.ModuleType, context: HookContext, timeout: float) -> HookOutcome:
+    """Run a loaded hook on its own daemon thread.
+
+    A plain daemon thread is used rather than the loop's default executor so a
+    hook that overruns its timeout cannot keep the dispatcher from exiting.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[HookOutcome] = loop.create_future()
+
+    def resolve(outcome: HookOutcome) -> None:
+        if not future.done():
+            future.set_result(outcome)
+
+    def target() -> None:
+        try:
+            outcome = call_hook(module, context)
+        except Exception as e:
+            outcome = (1, "", f"Hook execution failed: {e}")
+        with contextlib.suppress(RuntimeError):  # loop already closed after a timeout
+            loop.call_soon_threadsafe(resolve, outcome)
+
+    threading.Thread(target=target, name=f"hook-{module.__name__}", daemon=True).start()
+
+    try:
+        return await asyncio.wait_for(future, timeout=timeout)
+    except TimeoutError:
+        return 1, "", "Hook execution timed out"
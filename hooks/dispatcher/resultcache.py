@@ -0,0 +1,160 @@
+"""
+Content-addressed cache of checker hook results.
+
+A checker's verdict depends only on its own source, the language rules, the
+project's pyproject.toml and the edited file (plus the edit itself, since checkers
+only report issues the edit introduced, and whether the tool reported success,
+since checkers skip failed edits). Results are stored under a key derived from
+all of those, so a retried Edit or a rewrite back to already checked content
+replays the stored returncode/stderr instead of running the check again.
+
+Entries live in a SQLite file under ~/.claude and are evicted least recently
+used first once the stored results exceed MAX_CACHE_BYTES.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from hooklib import project
+from hooklib.context import HookContext
+
+from dispatcher import HOOK_DIR
+
+CACHE_PATH = Path(
+    os.environ.get("POST_TOOL_USE_RESULT_CACHE", Path.home() / ".claude" / "cache" / "hook-results.sqlite3")
+)
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+RULES_DIR = Path(__file__).resolve().parent.parent.parent / "rules"
+HOOKLIB_DIR = HOOK_DIR / "hooklib"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hook_results (
+    key TEXT PRIMARY KEY,
+    returncode INTEGER NOT NULL,
+    stdout TEXT NOT NULL,
+    stderr TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hook_results_last_used ON hook_results (last_used);
+"""
+
+_file_digests: dict[tuple[Path, int, int], str] = {}
+
+
+def cache_key(hook_id: str, script: Path, context: HookContext) -> str | None:
+    """Build the key for one hook run, or None if the edited file cannot be hashed."""
+    content_digest = context.content_digest
+    if content_digest is None:
+        return None
+
+    tool_input = {key: value for key, value in context.tool_input.items() if key != "content"}
+    edit = json.dumps(
+        [context.tool_name, context.cwd, tool_input, _response_fields(context)], sort_keys=True, default=str
+    )
+    parts = [
+        hook_id,
+        _digest_files([script, *sorted(HOOKLIB_DIR.glob("*.py")), *_pyproject_paths(context)]),
+        _digest_files(sorted(RULES_DIR.glob("*.json"))),
+        content_digest,
+        hashlib.sha256(edit.encode()).hexdigest(),
+    ]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def lookup(key: str, path: Path = CACHE_PATH) -> tuple[int, str, str] | None:
+    """Return a stored (returncode, stdout, stderr) and mark it as recently used."""
+    with contextlib.suppress(sqlite3.Error, OSError):
+        if not path.exists():
+            return None
+        with contextlib.closing(_connect(path)) as connection, connection:
+            row = connection.execute(
+                "SELECT returncode, stdout, stderr FROM hook_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE hook_results SET last_used = ? WHERE key = ?", (time.time(), key))
+            return int(row[0]), str(row[1]), str(row[2])
+    return None
+
+
+def store(key: str, outcome: tuple[int, str, str], path: Path = CACHE_PATH) -> None:
+    """Store a hook outcome and evict least recently used entries beyond MAX_CACHE_BYTES."""
+    returncode, stdout, stderr = outcome
+    size = len(stdout.encode(errors="replace")) + len(stderr.encode(errors="replace"))
+
+    with contextlib.suppress(sqlite3.Error, OSError):
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        with contextlib.closing(_connect(path)) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO hook_results (key, returncode, stdout, stderr, size, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, returncode, stdout, stderr, size, time.time()),
+            )
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM hook_results").fetchone()[0]
+            if total > MAX_CACHE_BYTES:
+                _evict(connection, total - MAX_CACHE_BYTES)
+
+
+def _evict(connection: sqlite3.Connection, excess: int) -> None:
+    evicted: list[str] = []
+    for key, size in connection.execute("SELECT key, size FROM hook_results ORDER BY last_used"):
+        evicted.append(key)
+        excess -= size
+        if excess <= 0:
+            break
+    connection.executemany("DELETE FROM hook_results WHERE key = ?", ((key,) for key in evicted))
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=1.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _response_fields(context: HookContext) -> list[object] | None:
+    """The parts of tool_response checkers read to decide whether the edit succeeded at all."""
+    response = context.payload.get("tool_response")
+    if not isinstance(response, dict):
+        return None
+    return [response.get("success"), response.get("type"), response.get("filePath"), "structuredPatch" in response]
+
+
+def _pyproject_paths(context: HookContext) -> list[Path]:
+    """The project's pyproject.toml plus the one nearest the edited file, which hooks read."""
+    paths = [Path(context.cwd) / "pyproject.toml"]
+    if context.resolved_path is not None:
+        nearest = project.resolve(context.resolved_path.parent).pyproject
+        if nearest is not None and nearest not in paths:
+            paths.append(nearest)
+    return paths
+
+
+def _digest_files(paths: Iterable[Path]) -> str:
+    """Hash file contents, memoised per (path, size, mtime) for long-lived processes."""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            digest.update(f"{path}:missing".encode())
+            continue
+
+        stat_key = (path, stat.st_size, stat.st_mtime_ns)
+        if stat_key not in _file_digests:
+            try:
+                _file_digests[stat_key] = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                _file_digests[stat_key] = "unreadable"
+        digest.update(f"{path}:{_file_digests[stat_key]}".encode())
+    return digest.hexdigest()
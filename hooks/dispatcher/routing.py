@@ -0,0 +1,86 @@
+"""
+File-type and path routing for PostToolUse hooks.
+
+Hooks declare which files they care about (extensions, path globs, exclusions, or
+a language whose rules/*.json supplies them), so the dispatcher can drop hooks
+that would only start up to decide there is nothing to do.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import functools
+import re
+from typing import NamedTuple
+
+import load_rules
+
+
+class LanguageFilters(NamedTuple):
+    extensions: tuple[str, ...]
+    excluded_extensions: tuple[str, ...]
+    excluded_paths: tuple[str, ...]
+
+
+def language_filters(language: str) -> LanguageFilters:
+    """Read the routing fields of rules/<language>.json from the compiled rules bundle."""
+    rules = load_rules.get_rules(language)
+    if rules is None:
+        return LanguageFilters((), (), ())
+
+    return LanguageFilters(
+        extensions=tuple(rules.get("extensions", [])),
+        excluded_extensions=tuple(rules.get("excluded_extensions", [])),
+        excluded_paths=tuple(rules.get("excluded_paths", [])),
+    )
+
+
+def is_excluded_path(file_path: str, language: str | None, patterns: tuple[str, ...]) -> bool:
+    """Check a path against the language's and the hook's exclusions.
+
+    Both use the excluded-path matcher compiled into the rules bundle, so routing
+    and the hooks (load_rules.py, load-rules.ts) always agree on what is excluded:
+    patterns containing a slash ("/tests/") match anywhere in the path, the rest
+    ("test_", "_test.py") within the file name.
+    """
+    compiled = load_rules.get_compiled_rules(language) if language else None
+    matchers = (compiled.excluded_paths if compiled is not None else None, _excluded_paths_matcher(patterns))
+    return any(matcher is not None and matcher.search(file_path) is not None for matcher in matchers)
+
+
+@functools.cache
+def _excluded_paths_matcher(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    regex = load_rules.excluded_paths_regex(patterns)
+    return re.compile(regex) if regex else None
+
+
+def is_applicable(
+    file_path: str,
+    *,
+    language: str | None = None,
+    extensions: tuple[str, ...] = (),
+    path_globs: tuple[str, ...] = (),
+    excluded_paths: tuple[str, ...] = (),
+) -> bool:
+    """Decide whether a hook with these filters has anything to do for the file.
+
+    Explicit extensions take precedence over the language's; exclusions from both
+    apply. A hook without any filter applies to every tool call.
+    """
+    filters = language_filters(language) if language else LanguageFilters((), (), ())
+    wanted_extensions = extensions or filters.extensions
+
+    if not (wanted_extensions or path_globs or excluded_paths or filters.excluded_paths or filters.excluded_extensions):
+        return True
+
+    if not file_path:
+        return False
+
+    lowered = file_path.lower()
+    if wanted_extensions and not lowered.endswith(tuple(ext.lower() for ext in wanted_extensions)):
+        return False
+    if filters.excluded_extensions and lowered.endswith(tuple(ext.lower() for ext in filters.excluded_extensions)):
+        return False
+    if path_globs and not any(fnmatch.fnmatch(file_path, pattern) for pattern in path_globs):
+        return False
+    return not is_excluded_path(file_path, language, excluded_paths)
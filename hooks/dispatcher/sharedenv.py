@@ -0,0 +1,156 @@
+"""
+Shared, pre-resolved interpreter environment for the PEP 723 hook scripts.
+
+Every hook declares its own `# /// script` dependency block, and `uv run` resolves
+that block again on every call. `post_tool_use.py --warmup` resolves the union of
+all blocks once into a lock file and a single virtualenv. After that the
+dispatcher runs hooks with the environment's interpreter directly, which needs no
+resolution and no network.
+
+Layout (under HOOK_ENV_DIR):
+    requirements.in    union of every hook's dependencies
+    requirements.lock  pinned resolution of requirements.in
+    venv/              the shared interpreter environment
+    stamp.json         dependencies the environment was built from
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+HOOK_ENV_DIR = Path(os.environ.get("POST_TOOL_USE_HOOK_ENV", Path.home() / ".claude" / "hook-env"))
+
+# Reference regex from PEP 723
+_SCRIPT_METADATA_RE = re.compile(r"(?m)^# /// (?P<type>[a-zA-Z0-9-]+)$\s(?P<content>(^#(| .*)$\s)+)^# ///$")
+
+
+def read_script_metadata(script: Path) -> dict[str, object]:
+    """Read the `# /// script` block of a PEP 723 script.
+
+    Returns:
+        The parsed metadata table, or an empty dict if the script has none
+    """
+    try:
+        source = script.read_text(encoding="utf-8")
+    except OSError:
+        return {}
+
+    for match in _SCRIPT_METADATA_RE.finditer(source):
+        if match.group("type") != "script":
+            continue
+        content = "".join(
+            line[2:] if line.startswith("# ") else line[1:]
+            for line in match.group("content").splitlines(keepends=True)
+        )
+        try:
+            return tomllib.loads(content)
+        except tomllib.TOMLDecodeError:
+            return {}
+
+    return {}
+
+
+def collect_requirements(scripts: list[Path]) -> tuple[list[str], str | None]:
+    """Union the dependencies and python requirements of the given scripts.
+
+    Returns:
+        Tuple of (sorted unique dependency specifiers, combined requires-python or None)
+    """
+    dependencies: set[str] = set()
+    python_specs: set[str] = set()
+
+    for script in scripts:
+        metadata = read_script_metadata(script)
+        match metadata.get("dependencies"):
+            case list(declared):
+                dependencies.update(str(dependency).strip() for dependency in declared)
+        match metadata.get("requires-python"):
+            case str(spec):
+                python_specs.add(spec.strip())
+
+    requires_python = ",".join(sorted(python_specs)) or None
+    return sorted(dependencies), requires_python
+
+
+def interpreter_path(env_dir: Path = HOOK_ENV_DIR) -> Path:
+    return env_dir / "venv" / "bin" / "python"
+
+
+def shared_interpreter(scripts: list[Path], env_dir: Path = HOOK_ENV_DIR) -> Path | None:
+    """Return the shared interpreter if it was built for the scripts' current dependencies."""
+    python = interpreter_path(env_dir)
+    if not python.exists():
+        return None
+
+    try:
+        stamp = json.loads((env_dir / "stamp.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    dependencies, requires_python = collect_requirements(scripts)
+    if stamp != {"dependencies": dependencies, "requires-python": requires_python}:
+        return None
+
+    return python
+
+
+def is_current_interpreter(python: Path) -> bool:
+    return Path(sys.prefix).resolve() == python.parent.parent.resolve()
+
+
+def warmup(scripts: list[Path], env_dir: Path = HOOK_ENV_DIR) -> int:
+    """Resolve every hook dependency into one locked environment.
+
+    The lock file is only re-resolved when the dependency union changes, so
+    repeated warmups and every later hook call stay offline.
+
+    Returns:
+        Process exit code
+    """
+    uv = shutil.which("uv")
+    if uv is None:
+        print("[post-tool-use-warmup] uv not found in PATH", file=sys.stderr)
+        return 1
+
+    dependencies, requires_python = collect_requirements(scripts)
+    stamp = {"dependencies": dependencies, "requires-python": requires_python}
+    requirements_in = env_dir / "requirements.in"
+    requirements_lock = env_dir / "requirements.lock"
+    python = interpreter_path(env_dir)
+
+    env_dir.mkdir(parents=True, exist_ok=True)
+    (env_dir / "stamp.json").unlink(missing_ok=True)
+    requested = "".join(f"{dependency}\n" for dependency in dependencies)
+    previous = requirements_in.read_text(encoding="utf-8") if requirements_in.exists() else None
+
+    steps: list[list[str]] = []
+    if not python.exists():
+        steps.append([uv, "venv", "--quiet", *_python_args(requires_python), str(python.parent.parent)])
+    if previous != requested or not requirements_lock.exists():
+        requirements_in.write_text(requested, encoding="utf-8")
+        steps.append(
+            [uv, "pip", "compile", "--quiet", "--python", str(python), str(requirements_in), "-o", str(requirements_lock)]
+        )
+    steps.append([uv, "pip", "sync", "--quiet", "--python", str(python), str(requirements_lock)])
+
+    for step in steps:
+        result = subprocess.run(step, check=False)
+        if result.returncode != 0:
+            requirements_in.unlink(missing_ok=True)
+            print(f"[post-tool-use-warmup] Failed: {' '.join(step)}", file=sys.stderr)
+            return result.returncode
+
+    (env_dir / "stamp.json").write_text(json.dumps(stamp, indent=2), encoding="utf-8")
+    print(f"[post-tool-use-warmup] {len(dependencies)} dependencies ready in {python}", file=sys.stderr)
+    return 0
+
+
+def _python_args(requires_python: str | None) -> list[str]:
+    return ["--python", requires_python] if requires_python else []
@@ -0,0 +1,209 @@
+"""
+Per-hook latency telemetry for the PostToolUse dispatcher.
+
+Every hook execution is recorded in a small SQLite store that keeps only the most
+recent MAX_SAMPLES rows. `post_tool_use.py --stats [--window 24h]` reports
+p50/p95/p99 wall time per hook and per tool, which is what we need to decide
+which checks belong on the critical path. Results replayed from the result cache
+are kept out of those percentiles and reported as a hit rate instead.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+TELEMETRY_PATH = Path(
+    os.environ.get("POST_TOOL_USE_TELEMETRY", Path.home() / ".claude" / "run" / "hook-telemetry.sqlite3")
+)
+MAX_SAMPLES = 50_000
+DEFAULT_WINDOW = "24h"
+TIMEOUT_MESSAGE = "Hook execution timed out"
+
+_WINDOW_RE = re.compile(r"^(?P<amount>\d+)(?P<unit>[smhd])$")
+_WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hook_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    hook TEXT NOT NULL,
+    tool_name TEXT NOT NULL,
+    file_extension TEXT NOT NULL,
+    wall_ms REAL NOT NULL,
+    exit_code INTEGER NOT NULL,
+    timed_out INTEGER NOT NULL,
+    stderr_bytes INTEGER NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS hook_runs_recorded_at ON hook_runs (recorded_at);
+"""
+
+
+class HookSample(NamedTuple):
+    hook: str
+    tool_name: str
+    file_extension: str
+    wall_ms: float
+    exit_code: int
+    timed_out: bool
+    stderr_bytes: int
+    cached: bool
+
+
+def sample(
+    hook: str,
+    tool_name: str,
+    file_path: str,
+    wall_ms: float,
+    outcome: tuple[int, str, str],
+    cancelled: bool = False,
+    cached: bool = False,
+) -> HookSample:
+    """Build a sample from one hook execution and its (returncode, stdout, stderr) outcome.
+
+    Hooks cancelled by the dispatch budget count as timeouts; cached marks an
+    outcome replayed from the result cache without running the hook.
+    """
+    returncode, _stdout, stderr = outcome
+    return HookSample(
+        hook=hook,
+        tool_name=tool_name,
+        file_extension=Path(file_path).suffix.lower() if file_path else "",
+        wall_ms=wall_ms,
+        exit_code=returncode,
+        timed_out=cancelled or stderr == TIMEOUT_MESSAGE,
+        stderr_bytes=len(stderr.encode(errors="replace")),
+        cached=cached,
+    )
+
+
+def record(samples: Iterable[HookSample], path: Path = TELEMETRY_PATH) -> None:
+    """Append samples and trim the store to MAX_SAMPLES rows.
+
+    Telemetry must never get in the way of the hooks, so storage errors are ignored.
+    """
+    rows = [(time.time(), *item) for item in samples]
+    if not rows:
+        return
+
+    with contextlib.suppress(sqlite3.Error, OSError):
+        path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        with contextlib.closing(_connect(path)) as connection, connection:
+            cursor = connection.executemany(
+                "INSERT INTO hook_runs (recorded_at, hook, tool_name, file_extension, wall_ms, exit_code,"
+                " timed_out, stderr_bytes, cached) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            last_id = cursor.lastrowid or connection.execute("SELECT MAX(id) FROM hook_runs").fetchone()[0]
+            connection.execute("DELETE FROM hook_runs WHERE id <= ?", (last_id - MAX_SAMPLES,))
+
+
+def parse_window(window: str) -> float:
+    """Convert a window such as "30m", "24h" or "7d" into seconds.
+
+    Raises:
+        ValueError: If the window is not <number><s|m|h|d>
+    """
+    match = _WINDOW_RE.match(window.strip())
+    if match is None:
+        raise ValueError(f"invalid window {window!r}, expected e.g. 30m, 24h or 7d")
+    return int(match.group("amount")) * _WINDOW_UNITS[match.group("unit")]
+
+
+def format_stats(window: str = DEFAULT_WINDOW, path: Path = TELEMETRY_PATH) -> str:
+    """Render p50/p95/p99 wall times per hook and per tool over the window, then cache hit rates."""
+    since = time.time() - parse_window(window)
+
+    if not path.exists():
+        return f"No hook telemetry recorded yet ({path})\n"
+
+    with contextlib.closing(_connect(path)) as connection:
+        rows: list[tuple[str, str, float, int, int, int]] = connection.execute(
+            "SELECT hook, tool_name, wall_ms, exit_code, timed_out, cached FROM hook_runs WHERE recorded_at >= ?",
+            (since,),
+        ).fetchall()
+
+    if not rows:
+        return f"No hook executions in the last {window}\n"
+
+    by_hook: dict[str, list[tuple[float, int, int]]] = defaultdict(list)
+    by_tool: dict[str, list[tuple[float, int, int]]] = defaultdict(list)
+    cache_hits: dict[str, int] = defaultdict(int)
+    for hook, tool_name, wall_ms, exit_code, timed_out, cached in rows:
+        if cached:
+            cache_hits[display_name(hook)] += 1
+            continue
+        by_hook[display_name(hook)].append((wall_ms, exit_code, timed_out))
+        by_tool[tool_name].append((wall_ms, exit_code, timed_out))
+
+    executed = len(rows) - sum(cache_hits.values())
+    sections = [f"Hook latency over the last {window} ({executed} executions)\n"]
+    if executed:
+        sections += [_format_table("hook", by_hook), _format_table("tool", by_tool)]
+    if cache_hits:
+        sections.append(_format_cache_hits(cache_hits, by_hook))
+    return "\n".join(sections)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=1.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(hook_runs)")}
+    if "cached" not in columns:
+        # Stores written before cache hits were told apart
+        connection.execute("ALTER TABLE hook_runs ADD COLUMN cached INTEGER NOT NULL DEFAULT 0")
+    return connection
+
+
+def _format_table(label: str, groups: dict[str, list[tuple[float, int, int]]]) -> str:
+    header = f"{label:<40} {'runs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'block':>6} {'error':>6} {'t/o':>4}"
+    lines = [header, "-" * len(header)]
+
+    def p95(item: tuple[str, list[tuple[float, int, int]]]) -> float:
+        return _percentile(sorted(run[0] for run in item[1]), 95)
+
+    for name, runs in sorted(groups.items(), key=p95, reverse=True):
+        wall_times = sorted(run[0] for run in runs)
+        blocked = sum(1 for _wall, exit_code, _timed_out in runs if exit_code == 2)
+        errors = sum(1 for _wall, exit_code, _timed_out in runs if exit_code not in (0, 2))
+        timeouts = sum(1 for _wall, _exit_code, timed_out in runs if timed_out)
+        lines.append(
+            f"{name[:40]:<40} {len(runs):>6} {_percentile(wall_times, 50):>9.1f} {_percentile(wall_times, 95):>9.1f} "
+            f"{_percentile(wall_times, 99):>9.1f} {blocked:>6} {errors:>6} {timeouts:>4}"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def _format_cache_hits(hits: dict[str, int], executed: dict[str, list[tuple[float, int, int]]]) -> str:
+    header = f"{'result cache':<40} {'hits':>6} {'runs':>6} {'hit rate':>9}"
+    lines = [header, "-" * len(header)]
+    for name, count in sorted(hits.items(), key=lambda item: item[1], reverse=True):
+        total = count + len(executed.get(name, []))
+        lines.append(f"{name[:40]:<40} {count:>6} {total:>6} {count / total:>9.0%}")
+    return "\n".join(lines) + "\n"
+
+
+def display_name(command: str) -> str:
+    """Short name for a hook command: its script file name when it has one."""
+    for token in reversed(command.split()):
+        token = token.rstrip(";")
+        if token.endswith((".py", ".sh")):
+            return Path(token).name
+    return command
+
+
+def _percentile(sorted_values: list[float], percent: int) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
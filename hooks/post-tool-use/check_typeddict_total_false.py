@@ -24,6 +24,9 @@ from typing import (
 )
 
 import ast_grep_py as sg
+from hooklib import pyproject
+from hooklib.context import HookContext, read_hook_input, read_target_file
+from hooklib.contract import HookResult, invoke_hook
 
 
 def main() -> None:
@@ -31,8 +34,17 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
+    _run_pipeline(parse_input())
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, _run_pipeline, context)
+
+
+def _run_pipeline(data: PostToolUseInput) -> None:
     try:
-        _execute_hook_pipeline()
+        _execute_hook_pipeline(data)
     except Exception:
         _handle_hook_error()
 
@@ -168,16 +180,12 @@ def _read_file_content(file_path: str) -> str | None:
     if not file_path or not Path(file_path).exists():
         return None
 
-    try:
-        with open(file_path, encoding="utf-8") as file_handle:
-            return file_handle.read()
-    except Exception:
-        return None
+    return read_target_file(file_path)
 
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw: str = sys.stdin.read()
+    input_raw: str = read_hook_input()
     if not input_raw:
         print("[check-typeddict-total-false] Skipping: No input provided")
         sys.exit(0)
@@ -219,7 +227,7 @@ def should_process(data: PostToolUseInput) -> bool:
     if not file_path or not file_path.endswith(".py"):
         return False
 
-    if not _check_python_version_311_or_higher():
+    if not _check_python_version_311_or_higher(file_path):
         return False
 
     excluded: bool = _is_excluded_path(file_path)
@@ -278,9 +286,8 @@ def extract_file_path(data: PostToolUseInput) -> str:
     return ""
 
 
-def _execute_hook_pipeline() -> NoReturn:
+def _execute_hook_pipeline(data: PostToolUseInput) -> NoReturn:
     """Execute the main hook logic pipeline."""
-    data: PostToolUseInput = parse_input()
     if not should_process(data):
         print("[check-typeddict-total-false] Skipping: File not eligible for processing")
         sys.exit(0)
@@ -299,30 +306,13 @@ def _is_excluded_path(file_path: str) -> bool:
     return False
 
 
-def _check_python_version_311_or_higher() -> bool:
+def _check_python_version_311_or_higher(file_path: str) -> bool:
     """Check if Python version is 3.11 or higher."""
     if sys.version_info.major > 3 or (sys.version_info.major == 3 and sys.version_info.minor >= 11):
         return True
 
-    pyproject_path = Path("pyproject.toml")
-    if pyproject_path.exists():
-        try:
-            with open(pyproject_path) as f:
-                content = f.read()
-
-            match = re.search(r'requires-python\s*=\s*"[^"]*3\.(\d+)', content)
-            if match:
-                minor = int(match.group(1))
-                return minor >= 11
-
-            match = re.search(r'target-version\s*=\s*"py3(\d+)"', content)
-            if match:
-                minor = int(match.group(1))
-                return minor >= 11
-        except Exception:
-            pass
-
-    return False
+    minimum_minor = pyproject.nearest(Path(file_path).parent).minimum_python_minor
+    return minimum_minor is not None and minimum_minor >= 11
 
 
 def _detect_class_definitions(node: sg.SgNode) -> list[TotalFalseIssue]:
@@ -502,8 +492,7 @@ def _get_existing_violations(
                 old_string = tool_input["old_string"]  # type: ignore[literal-required]
                 new_string = tool_input["new_string"]  # type: ignore[literal-required]
 
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+                current_content: str = read_target_file(file_path) or ""
 
                 if old_string and new_string and new_string in current_content:
                     pre_edit_content: str = current_content.replace(new_string, old_string, 1)
@@ -516,8 +505,7 @@ def _get_existing_violations(
     elif tool_name == "MultiEdit":
         if file_path and Path(file_path).exists():
             try:
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+                current_content: str = read_target_file(file_path) or ""
 
                 pre_edit_content: str = current_content
                 edits = tool_input["edits"]  # type: ignore[literal-required]
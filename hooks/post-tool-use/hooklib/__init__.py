@@ -0,0 +1 @@
+"""Shared helpers for the PostToolUse hook scripts."""
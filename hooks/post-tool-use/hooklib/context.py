@@ -0,0 +1,174 @@
+"""
+Prepared PostToolUse context shared by every hook of one dispatch.
+
+The dispatcher parses the payload once and hands each hook a HookContext with
+the fields hooks kept re-deriving: tool name, cwd, the resolved target path, the
+post-edit file content and the line ranges the edit touched. Hooks that still run
+as subprocesses get the path of a single payload file in POST_TOOL_USE_PAYLOAD_FILE
+instead of a private copy of the JSON on stdin.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import hashlib
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, NamedTuple
+
+PAYLOAD_FILE_ENV = "POST_TOOL_USE_PAYLOAD_FILE"
+
+_current_context: contextvars.ContextVar[HookContext | None] = contextvars.ContextVar(
+    "post_tool_use_context", default=None
+)
+
+
+class EditRange(NamedTuple):
+    """1-based, inclusive line span of edited text in the post-edit file."""
+
+    start_line: int
+    end_line: int
+
+
+@dataclass
+class HookContext:
+    payload: dict[str, Any]
+    payload_path: str | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any], payload_path: str | None = None) -> HookContext:
+        return cls(payload=payload, payload_path=payload_path)
+
+    @property
+    def tool_name(self) -> str:
+        return str(self.payload.get("tool_name", ""))
+
+    @property
+    def cwd(self) -> str:
+        return str(self.payload.get("cwd") or os.getcwd())
+
+    @property
+    def tool_input(self) -> dict[str, Any]:
+        tool_input = self.payload.get("tool_input")
+        return tool_input if isinstance(tool_input, dict) else {}
+
+    @functools.cached_property
+    def file_path(self) -> str:
+        """Target path as given by the tool (Write/Edit/MultiEdit/Read/NotebookEdit)."""
+        for key in ("file_path", "notebook_path", "target_file"):
+            value = self.tool_input.get(key)
+            if isinstance(value, str) and value:
+                return value
+        return ""
+
+    @functools.cached_property
+    def resolved_path(self) -> Path | None:
+        if not self.file_path:
+            return None
+        return (Path(self.cwd) / Path(self.file_path).expanduser()).resolve()
+
+    @functools.cached_property
+    def raw_content(self) -> bytes | None:
+        """Post-edit file bytes, read from disk once per context."""
+        if self.resolved_path is None:
+            return None
+        try:
+            return self.resolved_path.read_bytes()
+        except OSError:
+            return None
+
+    @functools.cached_property
+    def content(self) -> str | None:
+        """Post-edit file text with universal newlines, as open(..., encoding="utf-8") reads it."""
+        if self.raw_content is None:
+            return None
+        try:
+            text = self.raw_content.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    @functools.cached_property
+    def content_digest(self) -> str | None:
+        """SHA-256 of the post-edit file bytes, or None if the file is unreadable."""
+        if self.raw_content is None:
+            return None
+        return hashlib.sha256(self.raw_content).hexdigest()
+
+    @functools.cached_property
+    def edit_ranges(self) -> list[EditRange]:
+        """Line spans written by this tool call; the whole file for Write."""
+        content = self.content
+        if content is None:
+            return []
+
+        match self.tool_name:
+            case "Write":
+                return [EditRange(1, max(content.count("\n") + 1, 1))]
+            case "Edit":
+                new_strings = [self.tool_input.get("new_string")]
+            case "MultiEdit":
+                edits = self.tool_input.get("edits")
+                if not isinstance(edits, list):
+                    return []
+                new_strings = [edit.get("new_string") for edit in edits if isinstance(edit, dict)]
+            case _:
+                return []
+
+        ranges: list[EditRange] = []
+        for new_string in new_strings:
+            if not isinstance(new_string, str) or not new_string:
+                continue
+            offset = content.find(new_string)
+            if offset < 0:
+                continue
+            start_line = content.count("\n", 0, offset) + 1
+            ranges.append(EditRange(start_line, start_line + new_string.count("\n")))
+        return ranges
+
+
+def read_hook_input() -> str:
+    """Read the raw PostToolUse JSON from the shared payload file, or stdin as before."""
+    payload_path = os.environ.get(PAYLOAD_FILE_ENV)
+    if payload_path:
+        try:
+            return Path(payload_path).read_text(encoding="utf-8")
+        except OSError:
+            pass
+    return sys.stdin.read()
+
+
+def current_context() -> HookContext | None:
+    """Context of the hook invocation running in this thread, if any."""
+    return _current_context.get()
+
+
+def bind_context(context: HookContext) -> contextvars.Token[HookContext | None]:
+    return _current_context.set(context)
+
+
+def unbind_context(token: contextvars.Token[HookContext | None]) -> None:
+    _current_context.reset(token)
+
+
+def read_target_file(file_path: str) -> str | None:
+    """Return a file's content, reusing the context's copy when it is the edited file.
+
+    Returns:
+        The file content, or None if it cannot be read
+    """
+    context = current_context()
+    if context is not None and context.resolved_path is not None:
+        try:
+            if context.resolved_path == Path(file_path).expanduser().resolve():
+                return context.content
+        except OSError:
+            pass
+
+    try:
+        return Path(file_path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
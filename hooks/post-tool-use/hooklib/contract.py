@@ -0,0 +1,120 @@
+"""
+In-process hook contract.
+
+Every Python hook exposes `run(context) -> HookResult` next to its script-style
+`main()`, where `context` is the HookContext prepared once by the dispatcher. The
+dispatcher imports the hook and calls `run` directly instead of spawning
+`uv run <hook>.py`, so a hook invocation costs a function call rather than a
+process, an interpreter start and a JSON round trip.
+
+Hooks keep reporting through print() and sys.exit(); `invoke_hook` captures both
+per thread, which lets the dispatcher run several hooks concurrently.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import io
+import sys
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, NamedTuple, TextIO
+
+from hooklib.context import HookContext, bind_context, unbind_context
+
+
+class HookResult(NamedTuple):
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """Text stream that writes to the calling thread's capture buffer, if any."""
+
+    def __init__(self, fallback: TextIO) -> None:
+        self._fallback = fallback
+        self._local = threading.local()
+
+    @property
+    def encoding(self) -> str:  # pyright: ignore[reportIncompatibleVariableOverride]
+        return getattr(self._fallback, "encoding", "utf-8")
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def _target(self) -> TextIO:
+        return getattr(self._local, "buffer", None) or self._fallback
+
+    @contextmanager
+    def capture(self, buffer: TextIO) -> Iterator[None]:
+        previous = getattr(self._local, "buffer", None)
+        self._local.buffer = buffer
+        try:
+            yield
+        finally:
+            self._local.buffer = previous
+
+
+_install_lock = threading.Lock()
+
+
+def _thread_local_streams() -> tuple[_ThreadLocalStream, _ThreadLocalStream]:
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStream):
+            sys.stdout = _ThreadLocalStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadLocalStream):
+            sys.stderr = _ThreadLocalStream(sys.stderr)
+        return sys.stdout, sys.stderr
+
+
+def exit_status(exit_request: SystemExit) -> int:
+    """Translate a SystemExit into the status a script would have exited with."""
+    match exit_request.code:
+        case None:
+            return 0
+        case int(code):
+            return code
+        case message:
+            print(message, file=sys.stderr)
+            return 1
+
+
+def invoke_hook(hook_file: str, handler: Callable[[Any], object], context: HookContext) -> HookResult:
+    """Run a hook handler on the context's parsed payload with its output captured.
+
+    The banner printed by every hook's `main()` is emitted first so in-process
+    results are indistinguishable from the subprocess ones. The context stays
+    bound for the duration of the call, so helpers such as `read_target_file`
+    can reuse what it already holds.
+    """
+    hook_filename = Path(hook_file).stem.replace("_", "-")
+    stdout_stream, stderr_stream = _thread_local_streams()
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+
+    token = bind_context(context)
+    with stdout_stream.capture(stdout), stderr_stream.capture(stderr):
+        print(f"\n[{hook_filename}]", file=sys.stderr)
+        try:
+            result = handler(context.payload)
+            if inspect.isawaitable(result):
+                asyncio.run(result)  # pyright: ignore[reportArgumentType]
+        except SystemExit as e:
+            returncode = exit_status(e)
+        except Exception as e:
+            returncode = 1
+            print(f"Hook execution failed: {e}", file=sys.stderr)
+        finally:
+            unbind_context(token)
+
+    return HookResult(returncode, stdout.getvalue(), stderr.getvalue())
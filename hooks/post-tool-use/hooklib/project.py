@@ -0,0 +1,165 @@
+"""
+Project root and config file discovery shared by the hooks.
+
+The rule and knowledge injectors, inject_conftest and both type checkers all walk
+up from the edited file looking for marker files. resolve() does that walk once and
+reports every marker along the way, so each caller picks the one it needs. Which
+markers a directory contains is cached on disk next to the directory's mtime;
+creating, deleting or renaming an entry changes that mtime, so a directory that
+was seen before costs a single stat() instead of a probe per marker.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+CACHE_PATH = Path(
+    os.environ.get("POST_TOOL_USE_PROJECT_CACHE", Path.home() / ".claude" / "cache" / "project-layout.json")
+)
+CACHE_VERSION = 1
+# Directories remembered at once; the oldest entries are dropped first
+MAX_CACHED_DIRS = 4096
+
+MARKERS = (".git", "pyproject.toml", "package.json", ".venv", "tsconfig.json")
+ROOT_MARKERS = (".git", "pyproject.toml", "package.json", ".venv")
+
+_lock = threading.Lock()
+_entries: dict[str, tuple[int, tuple[str, ...]]] | None = None
+
+
+class ProjectLayout(NamedTuple):
+    """Markers found between a directory and the filesystem root, nearest first.
+
+    The filesystem root itself is never considered, as none of the walks this
+    replaces looked there.
+    """
+
+    start: Path
+    marked_dirs: tuple[tuple[Path, frozenset[str]], ...]
+
+    def nearest(self, *markers: str) -> Path | None:
+        """Closest directory containing any of the markers."""
+        for directory, present in self.marked_dirs:
+            if not present.isdisjoint(markers):
+                return directory
+        return None
+
+    @property
+    def root(self) -> Path | None:
+        return self.nearest(*ROOT_MARKERS)
+
+    @property
+    def pyproject(self) -> Path | None:
+        return self._nearest_file("pyproject.toml")
+
+    @property
+    def tsconfig(self) -> Path | None:
+        return self._nearest_file("tsconfig.json")
+
+    @property
+    def venv(self) -> Path | None:
+        return self._nearest_file(".venv")
+
+    @property
+    def git_dir(self) -> Path | None:
+        return self._nearest_file(".git")
+
+    def _nearest_file(self, marker: str) -> Path | None:
+        directory = self.nearest(marker)
+        return directory / marker if directory else None
+
+
+def resolve(start: str | Path) -> ProjectLayout:
+    """Collect the markers of start and each of its ancestors.
+
+    Args:
+        start: Directory to begin the walk at; relative paths are taken from the cwd
+    """
+    start_dir = Path(os.path.abspath(start))
+    marked_dirs: list[tuple[Path, frozenset[str]]] = []
+
+    with _lock:
+        entries = _load_entries()
+        dirty = False
+
+        current = start_dir
+        while current != current.parent:
+            key = str(current)
+            try:
+                mtime = os.stat(key).st_mtime_ns
+            except OSError:
+                mtime = -1
+
+            cached = entries.get(key)
+            if cached is not None and cached[0] == mtime:
+                present = cached[1]
+            else:
+                present = tuple(marker for marker in MARKERS if os.path.exists(os.path.join(key, marker)))
+                entries.pop(key, None)
+                entries[key] = (mtime, present)
+                dirty = True
+
+            if present:
+                marked_dirs.append((current, frozenset(present)))
+            current = current.parent
+
+        if dirty:
+            _save_entries(entries)
+
+    return ProjectLayout(start=start_dir, marked_dirs=tuple(marked_dirs))
+
+
+def project_root(start: str | Path) -> Path:
+    """Nearest directory with .git, pyproject.toml, package.json or .venv; start itself if none."""
+    layout = resolve(start)
+    return layout.root or layout.start
+
+
+def _load_entries() -> dict[str, tuple[int, tuple[str, ...]]]:
+    global _entries
+    if _entries is not None:
+        return _entries
+
+    _entries = {}
+    try:
+        data = json.loads(CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return _entries
+
+    match data:
+        case {"version": version, "dirs": dict(dirs)} if version == CACHE_VERSION:
+            for directory, entry in dirs.items():
+                match entry:
+                    case [int(mtime), list(present)]:
+                        _entries[directory] = (mtime, tuple(marker for marker in present if marker in MARKERS))
+    return _entries
+
+
+def _save_entries(entries: dict[str, tuple[int, tuple[str, ...]]]) -> None:
+    """Write the cache atomically; concurrent hooks at worst probe a directory again."""
+    for directory in list(entries)[: max(len(entries) - MAX_CACHED_DIRS, 0)]:
+        del entries[directory]
+
+    data = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "dirs": {directory: [mtime, list(present)] for directory, (mtime, present) in entries.items()},
+        },
+        separators=(",", ":"),
+    )
+
+    with contextlib.suppress(OSError):
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        fd, temp_path = tempfile.mkstemp(dir=CACHE_PATH.parent, prefix=f".{CACHE_PATH.stem}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, CACHE_PATH)
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
@@ -0,0 +1,122 @@
+"""
+Parsed pyproject.toml shared by the hooks.
+
+Lint, type check, inject and check hooks each need a few fields of the project's
+pyproject.toml: pytest's python_files, the ruff, basedpyright/pyright and mypy
+tables, and the target Python version. load() parses a file once per
+(path, size, mtime) and keeps the result for the life of the process, so every
+hook of a dispatch, and every dispatch a daemon serves, shares one parse.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from hooklib import project
+
+_lock = threading.Lock()
+_parsed: dict[Path, tuple[tuple[int, int], Pyproject]] = {}
+
+_PYTHON_MINOR_RE = re.compile(r"3\.(\d+)")
+_RUFF_TARGET_MINOR_RE = re.compile(r"py3(\d+)")
+
+
+@dataclass(frozen=True)
+class Pyproject:
+    """One pyproject.toml; a missing or malformed file reads as an empty table."""
+
+    path: Path
+    data: dict[str, Any] = field(default_factory=dict)
+    exists: bool = False
+
+    def tool(self, name: str) -> dict[str, Any] | None:
+        """The [tool.<name>] table, or None if the project does not configure it."""
+        tools = self.data.get("tool")
+        table = tools.get(name) if isinstance(tools, dict) else None
+        return table if isinstance(table, dict) else None
+
+    @property
+    def pytest_python_files(self) -> list[str]:
+        match self.tool("pytest"):
+            case {"ini_options": {"python_files": list(patterns)}}:
+                return [pattern for pattern in patterns if isinstance(pattern, str)]
+            case _:
+                return []
+
+    @property
+    def ruff(self) -> dict[str, Any] | None:
+        return self.tool("ruff")
+
+    @property
+    def basedpyright(self) -> dict[str, Any] | None:
+        return self.tool("basedpyright")
+
+    @property
+    def pyright(self) -> dict[str, Any] | None:
+        return self.tool("pyright")
+
+    @property
+    def mypy(self) -> dict[str, Any] | None:
+        return self.tool("mypy")
+
+    @property
+    def requires_python(self) -> str | None:
+        match self.data:
+            case {"project": {"requires-python": str(requires_python)}} if requires_python:
+                return requires_python
+            case _:
+                return None
+
+    @property
+    def minimum_python_minor(self) -> int | None:
+        """Lowest Python 3 minor version the project targets, from requires-python or ruff."""
+        if self.requires_python and (match := _PYTHON_MINOR_RE.search(self.requires_python)):
+            return int(match.group(1))
+
+        match self.ruff:
+            case {"target-version": str(target_version)} if _RUFF_TARGET_MINOR_RE.fullmatch(target_version):
+                return int(target_version.removeprefix("py3"))
+            case _:
+                return None
+
+
+def load(path: str | Path) -> Pyproject:
+    """Parse a pyproject.toml, reusing the previous parse while the file is unchanged."""
+    path = Path(os.path.abspath(path))
+    try:
+        stat = path.stat()
+    except OSError:
+        return Pyproject(path)
+
+    stat_key = (stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        cached = _parsed.get(path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+
+    try:
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError):
+        data = {}
+
+    config = Pyproject(path, data, exists=True)
+    with _lock:
+        _parsed[path] = (stat_key, config)
+    return config
+
+
+def for_project(project_root: str | Path) -> Pyproject:
+    """The pyproject.toml directly in project_root."""
+    return load(Path(project_root) / "pyproject.toml")
+
+
+def nearest(start: str | Path) -> Pyproject:
+    """The closest pyproject.toml in start or one of its ancestors."""
+    path = project.resolve(start).pyproject
+    return load(path) if path else Pyproject(Path(os.path.abspath(start)) / "pyproject.toml")
@@ -0,0 +1,274 @@
+"""
+Incremental scanner for the tool uses in a session transcript.
+
+The transcript JSONL only ever grows, and late in a long session it is tens of
+megabytes. Every inject_* hook needs the same facts from it: which files were
+Read, which were edited or written, and which tool_use ids were seen. One scanner
+collects all of them in a single pass. A small sidecar per session stores how many
+bytes were already consumed, so each call only parses the lines appended since
+the last one, and hooks running in the same process share the result in memory.
+
+The unparsed region is memory-mapped and read forward in CHUNK_SIZE pieces cut at
+line boundaries, so indexing a long session for the first time keeps memory flat
+instead of holding the whole transcript and its split lines at once.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+
+import orjson
+
+INDEX_DIR = Path(
+    os.environ.get("POST_TOOL_USE_TRANSCRIPT_INDEX", Path.home() / ".claude" / "cache" / "transcript-index")
+)
+INDEX_VERSION = 2
+CHUNK_SIZE = 1024 * 1024
+# Sidecars of sessions untouched for this long are removed when a new session starts
+STALE_INDEX_SECONDS = 7 * 24 * 3600
+
+_SAFE_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+# Every record the index cares about contains both literals, so lines without them
+# are rejected before JSON decoding; tool_result lines only carry "tool_use_id"
+_TOOL_USE_MARKER = b'"tool_use"'
+_ASSISTANT_MARKER = b'"assistant"'
+
+_lock = threading.Lock()
+_loaded: dict[Path, TranscriptIndex] = {}
+
+
+class TranscriptSummary(NamedTuple):
+    """Tool uses seen so far in a session; paths exactly as the tools received them."""
+
+    read_paths: frozenset[str]
+    written_paths: frozenset[str]
+    tool_use_ids: frozenset[str]
+
+
+EMPTY_SUMMARY = TranscriptSummary(frozenset(), frozenset(), frozenset())
+
+
+@dataclass
+class TranscriptIndex:
+    transcript: str
+    inode: int
+    offset: int = 0
+    read_paths: set[str] = field(default_factory=set)
+    written_paths: set[str] = field(default_factory=set)
+    tool_use_ids: set[str] = field(default_factory=set)
+
+    def summary(self) -> TranscriptSummary:
+        return TranscriptSummary(
+            read_paths=frozenset(self.read_paths),
+            written_paths=frozenset(self.written_paths),
+            tool_use_ids=frozenset(self.tool_use_ids),
+        )
+
+
+def scan(transcript_path: str | Path, session_id: str | None = None) -> TranscriptSummary:
+    """Bring the session's index up to date and return what it has seen.
+
+    A transcript that was replaced or truncated since the last call is indexed
+    again from the start.
+    """
+    transcript = Path(transcript_path)
+    try:
+        stat = transcript.stat()
+    except OSError:
+        return EMPTY_SUMMARY
+
+    sidecar = _sidecar_path(transcript, session_id)
+    with _lock:
+        index = _loaded.get(sidecar) or _load(sidecar)
+        if (
+            index is None
+            or index.transcript != str(transcript)
+            or index.inode != stat.st_ino
+            or index.offset > stat.st_size
+        ):
+            index = TranscriptIndex(transcript=str(transcript), inode=stat.st_ino)
+
+        if index.offset < stat.st_size and _consume(transcript, index):
+            _save(sidecar, index)
+
+        _loaded[sidecar] = index
+        return index.summary()
+
+
+def _consume(transcript: Path, index: TranscriptIndex) -> bool:
+    """Parse the complete lines appended after index.offset.
+
+    A trailing line without its newline is still being written and is left for
+    the next call.
+
+    Returns:
+        True if the offset advanced
+    """
+    try:
+        with open(transcript, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = mapped.rfind(b"\n", index.offset) + 1
+            if end <= index.offset:
+                return False
+
+            for line in _lines(mapped, index.offset, end, _TOOL_USE_MARKER):
+                _index_line(line, index)
+    except (OSError, ValueError):
+        return False
+
+    index.offset = end
+    return True
+
+
+def _lines(buffer: mmap.mmap, start: int, end: int, marker: bytes, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the lines of buffer[start:end] that contain marker; buffer[end - 1] must be a newline.
+
+    Only one chunk is copied out of the map at a time, and each ends at a newline
+    so no line straddles two. Lines are located by searching for the marker rather
+    than by splitting the chunk, so lines without it cost a substring scan and
+    nothing else.
+    """
+    position = start
+    while position < end:
+        chunk_end = buffer.rfind(b"\n", position, min(end, position + chunk_size)) + 1
+        if chunk_end == 0:
+            # A single line longer than chunk_size
+            chunk_end = buffer.find(b"\n", position, end) + 1
+        yield from _lines_containing(buffer[position:chunk_end], marker)
+        position = chunk_end
+
+
+def _lines_containing(chunk: bytes, marker: bytes) -> list[bytes]:
+    lines: list[bytes] = []
+    hit = chunk.find(marker)
+    while hit >= 0:
+        line_start = chunk.rfind(b"\n", 0, hit) + 1
+        line_end = chunk.find(b"\n", hit)
+        if line_end < 0:
+            line_end = len(chunk)
+        lines.append(chunk[line_start:line_end])
+        hit = chunk.find(marker, line_end)
+    return lines
+
+
+def _index_line(line: bytes, index: TranscriptIndex) -> None:
+    if _ASSISTANT_MARKER not in line:
+        return
+
+    try:
+        entry = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return
+
+    if not isinstance(entry, dict) or entry.get("type") != "assistant":
+        return
+
+    message = entry.get("message")
+    if not isinstance(message, dict) or message.get("role") != "assistant":
+        return
+
+    content = message.get("content")
+    if not isinstance(content, list):
+        return
+
+    for block in content:
+        if not isinstance(block, dict) or block.get("type") != "tool_use":
+            continue
+
+        tool_use_id = block.get("id")
+        if isinstance(tool_use_id, str) and tool_use_id:
+            index.tool_use_ids.add(tool_use_id)
+
+        tool_input = block.get("input")
+        if not isinstance(tool_input, dict):
+            continue
+
+        match block.get("name"):
+            case "Read":
+                file_path = tool_input.get("file_path")
+                if isinstance(file_path, str) and file_path:
+                    index.read_paths.add(file_path)
+            case "Write" | "Edit" | "MultiEdit" | "NotebookEdit":
+                file_path = tool_input.get("file_path") or tool_input.get("notebook_path")
+                if isinstance(file_path, str) and file_path:
+                    index.written_paths.add(file_path)
+
+
+def _sidecar_path(transcript: Path, session_id: str | None) -> Path:
+    if session_id and _SAFE_SESSION_ID_RE.match(session_id):
+        return INDEX_DIR / f"{session_id}.json"
+    return INDEX_DIR / f"{hashlib.sha256(str(transcript).encode()).hexdigest()[:32]}.json"
+
+
+def _load(sidecar: Path) -> TranscriptIndex | None:
+    try:
+        data = orjson.loads(sidecar.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+    match data:
+        case {
+            "version": version,
+            "transcript": str(transcript),
+            "inode": int(inode),
+            "offset": int(offset),
+            "read_paths": list(read_paths),
+            "written_paths": list(written_paths),
+            "tool_use_ids": list(tool_use_ids),
+        } if version == INDEX_VERSION:
+            return TranscriptIndex(
+                transcript=transcript,
+                inode=inode,
+                offset=offset,
+                read_paths={path for path in read_paths if isinstance(path, str)},
+                written_paths={path for path in written_paths if isinstance(path, str)},
+                tool_use_ids={tool_use_id for tool_use_id in tool_use_ids if isinstance(tool_use_id, str)},
+            )
+        case _:
+            return None
+
+
+def _save(sidecar: Path, index: TranscriptIndex) -> None:
+    """Write the sidecar atomically; concurrent hooks at worst redo some parsing."""
+    data = orjson.dumps(
+        {
+            "version": INDEX_VERSION,
+            "transcript": index.transcript,
+            "inode": index.inode,
+            "offset": index.offset,
+            "read_paths": sorted(index.read_paths),
+            "written_paths": sorted(index.written_paths),
+            "tool_use_ids": sorted(index.tool_use_ids),
+        }
+    )
+
+    with contextlib.suppress(OSError):
+        INDEX_DIR.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if not sidecar.exists():
+            _prune_stale(INDEX_DIR)
+
+        fd, temp_path = tempfile.mkstemp(dir=INDEX_DIR, prefix=f".{sidecar.stem}-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, sidecar)
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
+
+
+def _prune_stale(directory: Path) -> None:
+    cutoff = time.time() - STALE_INDEX_SECONDS
+    for sidecar in directory.glob("*.json"):
+        with contextlib.suppress(OSError):
+            if sidecar.stat().st_mtime < cutoff:
+                sidecar.unlink()
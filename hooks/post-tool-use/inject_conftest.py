@@ -3,21 +3,28 @@
 # requires-python = ">=3.11"
 # dependencies = [
 #     "orjson",
-#     "toml>=0.10.2",
 # ]
 # ///
 # pyright: reportMissingImports=false
 
 from __future__ import annotations
 
+import ast
+import contextlib
+import functools
 import hashlib
+import os
 import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
+from stat import S_ISREG
 from typing import Any, Literal, NotRequired, TypedDict
 
 import orjson
-import toml
+from hooklib import project, pyproject, transcript
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 
 
 class ReadToolInput(TypedDict):
@@ -85,52 +92,27 @@ class ConftestInfo(TypedDict):
     last_modified: str
 
 
-class ProjectRootFinder:
-    PROJECT_ROOT_MARKERS = ["pyproject.toml", ".venv", ".git"]
+class ConftestEntry(TypedDict):
+    size: int
+    mtime_ns: int
+    hash: str
 
-    @classmethod
-    def find_root(cls, start_path: Path) -> Path | None:
-        current_dir = start_path.resolve()
-
-        while current_dir != current_dir.parent:
-            for marker in cls.PROJECT_ROOT_MARKERS:
-                marker_path = current_dir / marker
-                if marker_path.exists() and (
-                    marker_path.is_file() or marker_path.is_dir()
-                ):
-                    return current_dir
-            current_dir = current_dir.parent
 
-        return None
+class FixtureInfo(TypedDict):
+    name: str
+    scope: str
+    autouse: bool
+    params: str
+    start_line: int
+    end_line: int
 
 
 class TestFileDetector:
     DEFAULT_TEST_PATTERNS = ["test_*.py", "*_test.py", "*_tests.py", "tests.py"]
 
-    def __init__(self) -> None:
-        self.test_patterns = self._load_test_patterns()
-
-    def _load_test_patterns(self) -> list[str]:
-        pyproject_path = Path("pyproject.toml")
-
-        if not pyproject_path.exists():
-            return self.DEFAULT_TEST_PATTERNS
-
-        try:
-            with open(pyproject_path, encoding="utf-8") as f:
-                config: dict[str, Any] = toml.load(f)
-
-            tool_config = config.get("tool", {})
-            pytest_config = tool_config.get("pytest", {})
-            ini_options = pytest_config.get("ini_options", {})
-
-            python_files = ini_options.get("python_files", [])
-            if isinstance(python_files, list) and python_files:
-                return python_files
-
-            return self.DEFAULT_TEST_PATTERNS
-        except Exception:
-            return self.DEFAULT_TEST_PATTERNS
+    def test_patterns(self, file_path: str) -> list[str]:
+        """python_files of the pytest config governing file_path, or pytest's defaults."""
+        return pyproject.nearest(Path(file_path).parent).pytest_python_files or self.DEFAULT_TEST_PATTERNS
 
     def is_test_file(self, file_path: str) -> bool:
         if not file_path.endswith(".py"):
@@ -147,7 +129,7 @@ class TestFileDetector:
         ):
             return True
 
-        for pattern in self.test_patterns:
+        for pattern in self.test_patterns(file_path):
             cleaned_pattern = pattern.replace("*", "")
             if cleaned_pattern in file_name:
                 return True
@@ -157,14 +139,16 @@ class TestFileDetector:
 
 class ConftestFinder:
     PACKAGE_CONFTEST_DISTANCE_OFFSET = 1000
+    PROJECT_ROOT_MARKERS = ("pyproject.toml", ".venv", ".git")
 
     def __init__(self, test_file_path: str, cwd: str | None = None) -> None:
         self.test_file = Path(test_file_path).resolve()
         self.project_root = (
             Path(cwd).resolve()
             if cwd
-            else ProjectRootFinder.find_root(self.test_file.parent)
+            else project.resolve(self.test_file.parent).nearest(*self.PROJECT_ROOT_MARKERS)
         )
+        self.conftest_map = ConftestMap(self.project_root) if self.project_root else None
 
     def find_conftests(self) -> list[ConftestInfo]:
         if not self.project_root:
@@ -176,6 +160,8 @@ class ConftestFinder:
         package_conftests = self._collect_mirrored_package_conftests(existing_paths)
         conftest_infos.extend(package_conftests)
 
+        if self.conftest_map:
+            self.conftest_map.save()
         return sorted(conftest_infos, key=lambda x: x["distance"])
 
     def _collect_upward_conftests(self) -> list[ConftestInfo]:
@@ -193,8 +179,9 @@ class ConftestFinder:
         distance = 0
 
         while current_dir >= self.project_root and current_dir != current_dir.parent:
-            conftest_path = current_dir / "conftest.py"
-            if conftest_path.is_file():
+            entry = self.conftest_map.conftest(current_dir) if self.conftest_map else None
+            if entry is not None:
+                conftest_path = current_dir / "conftest.py"
                 try:
                     relative_path = conftest_path.relative_to(self.project_root)
                     path_str = (
@@ -205,24 +192,7 @@ class ConftestFinder:
                 except ValueError:
                     path_str = str(conftest_path)
 
-                try:
-                    file_content = conftest_path.read_bytes()
-                    file_hash = hashlib.sha256(file_content).hexdigest()[:16]
-                    last_modified = datetime.fromtimestamp(
-                        conftest_path.stat().st_mtime
-                    ).isoformat()
-                except OSError:
-                    file_hash = "unknown"
-                    last_modified = "unknown"
-
-                conftest_infos.append(
-                    ConftestInfo(
-                        path=path_str,
-                        distance=distance,
-                        hash=file_hash,
-                        last_modified=last_modified,
-                    )
-                )
+                conftest_infos.append(self._conftest_info(path_str, distance, entry))
 
             if current_dir == self.project_root:
                 break
@@ -257,9 +227,10 @@ class ConftestFinder:
 
         for i, part in enumerate(test_subdirectory_parts):
             current_pkg_path = current_pkg_path / part
-            pkg_conftest = current_pkg_path / "conftest.py"
+            entry = self.conftest_map.conftest(current_pkg_path) if self.conftest_map else None
 
-            if pkg_conftest.is_file():
+            if entry is not None:
+                pkg_conftest = current_pkg_path / "conftest.py"
                 try:
                     relative_path = pkg_conftest.relative_to(Path.cwd())
                     path_str = str(relative_path)
@@ -267,88 +238,245 @@ class ConftestFinder:
                     path_str = str(pkg_conftest)
 
                 if path_str not in existing_paths:
-                    try:
-                        file_content = pkg_conftest.read_bytes()
-                        file_hash = hashlib.sha256(file_content).hexdigest()[:16]
-                        last_modified = datetime.fromtimestamp(
-                            pkg_conftest.stat().st_mtime
-                        ).isoformat()
-                    except OSError:
-                        file_hash = "unknown"
-                        last_modified = "unknown"
-
                     conftest_infos.append(
-                        ConftestInfo(
-                            path=path_str,
-                            distance=self.PACKAGE_CONFTEST_DISTANCE_OFFSET + i,
-                            hash=file_hash,
-                            last_modified=last_modified,
-                        )
+                        self._conftest_info(path_str, self.PACKAGE_CONFTEST_DISTANCE_OFFSET + i, entry)
                     )
 
         return conftest_infos
 
+    @staticmethod
+    def _conftest_info(path_str: str, distance: int, entry: ConftestEntry) -> ConftestInfo:
+        return ConftestInfo(
+            path=path_str,
+            distance=distance,
+            hash=entry["hash"],
+            last_modified=datetime.fromtimestamp(entry["mtime_ns"] / 1e9).isoformat(),
+        )
 
-class ConftestInjector:
-    def __init__(self, project_root: Path, transcript_path: str) -> None:
-        self.project_root = project_root
-        self.transcript_path = Path(transcript_path)
-
-    def _has_conftest_been_read(self, conftest_path: Path) -> bool:
-        if not self.transcript_path.exists():
-            return False
 
-        try:
-            conftest_path_str = str(conftest_path)
-            transcript_content = self.transcript_path.read_text(encoding="utf-8")
+class ConftestMap:
+    """On-disk map of the conftest.py files of one project, keyed by directory.
 
-            for line in transcript_content.splitlines():
-                if not line.strip():
-                    continue
+    Every lookup stats the candidate conftest.py exactly once, which is enough to
+    notice it being created, modified or deleted: the content is hashed again only
+    when its size or mtime changed, and a directory whose conftest is gone is
+    dropped. Unchanged conftests are never opened.
+    """
 
-                try:
-                    entry: RawTranscriptEntry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
+    MAP_DIR = Path.home() / ".claude" / "cache" / "conftest-map"
+    VERSION = 1
 
-                if not isinstance(entry, dict):
-                    continue
+    def __init__(self, project_root: Path, map_dir: Path | None = None) -> None:
+        self.project_root = project_root
+        root_key = hashlib.sha256(str(project_root).encode()).hexdigest()[:16]
+        self.map_path = (map_dir or self.MAP_DIR) / f"{root_key}.json"
+        self._dirty = False
 
-                if entry.get("type") != "assistant":
-                    continue
+    @functools.cached_property
+    def _dirs(self) -> dict[str, ConftestEntry]:
+        try:
+            data = orjson.loads(self.map_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            data = None
+
+        match data:
+            case {"version": self.VERSION, "root": root, "dirs": dict(dirs)} if root == str(self.project_root):
+                return dirs
+            case _:
+                return {}
+
+    def conftest(self, directory: Path) -> ConftestEntry | None:
+        """Return the entry for directory/conftest.py, or None if there is no such file."""
+        key = str(directory)
+        conftest_path = os.path.join(key, "conftest.py")
+        try:
+            stat = os.stat(conftest_path)
+        except OSError:
+            stat = None
 
-                message = entry.get("message")
-                if not isinstance(message, dict):
-                    continue
+        if stat is None or not S_ISREG(stat.st_mode):
+            if self._dirs.pop(key, None) is not None:
+                self._dirty = True
+            return None
 
-                if message.get("role") != "assistant":
-                    continue
+        match self._dirs.get(key):
+            case {"size": size, "mtime_ns": mtime_ns, "hash": str()} as entry if (size, mtime_ns) == (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                return entry
 
-                content = message.get("content")
-                if not isinstance(content, list):
-                    continue
+        try:
+            with open(conftest_path, "rb") as f:
+                file_hash = hashlib.file_digest(f, "sha256").hexdigest()[:16]
+        except OSError:
+            file_hash = "unknown"
+
+        entry = ConftestEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, hash=file_hash)
+        self._dirs[key] = entry
+        self._dirty = True
+        return entry
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        data = orjson.dumps({"version": self.VERSION, "root": str(self.project_root), "dirs": self._dirs})
+
+        with contextlib.suppress(OSError):
+            self.map_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.map_path.parent, prefix=f".{self.map_path.stem}-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self.map_path)
+            except OSError:
+                Path(temp_path).unlink(missing_ok=True)
+        self._dirty = False
+
+
+class FixtureIndex:
+    """On-disk fixture listings of conftest files, keyed by content hash.
+
+    Large conftests are mostly fixture bodies, so the injector can name each
+    fixture with its scope, autouse flag, params and line span and let the agent
+    read only the fixtures it needs. A conftest is parsed again only when its
+    content hash changes.
+    """
+
+    INDEX_PATH = Path.home() / ".claude" / "cache" / "fixture-index.json"
+    VERSION = 1
+    # Conftest versions remembered at once; the least recently used are dropped first
+    MAX_ENTRIES = 512
+    PARAMS_DISPLAY_LENGTH = 60
+
+    def __init__(self, index_path: Path | None = None) -> None:
+        self.index_path = index_path or self.INDEX_PATH
+        self._dirty = False
+
+    @functools.cached_property
+    def _entries(self) -> dict[str, list[FixtureInfo]]:
+        try:
+            data = orjson.loads(self.index_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            data = None
+
+        match data:
+            case {"version": self.VERSION, "entries": dict(entries)}:
+                return entries
+            case _:
+                return {}
+
+    def fixtures(self, conftest_path: Path, content_hash: str) -> list[FixtureInfo] | None:
+        """Return the fixtures defined in a conftest, parsing it only for an unseen hash.
+
+        Returns:
+            The fixtures in source order, or None if the file cannot be read or parsed
+        """
+        fixtures = self._entries.pop(content_hash, None)
+        if fixtures is None:
+            try:
+                source = conftest_path.read_bytes()
+                fixtures = self.parse(source)
+            except (OSError, SyntaxError, ValueError):
+                return None
+            self._dirty = True
+
+        # Re-inserted last, so eviction in save() drops the least recently used entries
+        self._entries[content_hash] = fixtures
+        return fixtures
 
-                for block in content:
-                    if not isinstance(block, dict):
-                        continue
+    @classmethod
+    def parse(cls, source: bytes) -> list[FixtureInfo]:
+        fixtures: list[FixtureInfo] = []
+        for node in ast.parse(source).body:
+            if not isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+                continue
+
+            for decorator in node.decorator_list:
+                if cls._is_fixture_decorator(decorator):
+                    fixtures.append(cls._fixture_info(node, decorator))
+                    break
+        return fixtures
+
+    @staticmethod
+    def _is_fixture_decorator(decorator: ast.expr) -> bool:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        match target:
+            case ast.Name(id="fixture" | "yield_fixture") | ast.Attribute(attr="fixture" | "yield_fixture"):
+                return True
+            case _:
+                return False
 
-                    if block.get("type") != "tool_use":
-                        continue
+    @classmethod
+    def _fixture_info(cls, node: ast.FunctionDef | ast.AsyncFunctionDef, decorator: ast.expr) -> FixtureInfo:
+        fixture = FixtureInfo(
+            name=node.name,
+            scope="function",
+            autouse=False,
+            params="",
+            start_line=min(item.lineno for item in [node, *node.decorator_list]),
+            end_line=node.end_lineno or node.lineno,
+        )
 
-                    if block.get("name") != "Read":
-                        continue
+        keywords = decorator.keywords if isinstance(decorator, ast.Call) else []
+        for keyword in keywords:
+            match keyword.arg, keyword.value:
+                case "name", ast.Constant(value=str(name)):
+                    fixture["name"] = name
+                case "scope", ast.Constant(value=str(scope)):
+                    fixture["scope"] = scope
+                case "scope", _:
+                    fixture["scope"] = "dynamic"
+                case "autouse", ast.Constant(value=bool(autouse)):
+                    fixture["autouse"] = autouse
+                case "params", value:
+                    params = ast.unparse(value)
+                    if len(params) > cls.PARAMS_DISPLAY_LENGTH:
+                        params = params[: cls.PARAMS_DISPLAY_LENGTH - 3] + "..."
+                    fixture["params"] = params
+        return fixture
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        entries = self._entries
+        for content_hash in list(entries)[: max(len(entries) - self.MAX_ENTRIES, 0)]:
+            del entries[content_hash]
+        data = orjson.dumps({"version": self.VERSION, "entries": entries})
+
+        with contextlib.suppress(OSError):
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.index_path.parent, prefix=".fixture-index-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self.index_path)
+            except OSError:
+                Path(temp_path).unlink(missing_ok=True)
+        self._dirty = False
 
-                    tool_input = block.get("input")
-                    if not isinstance(tool_input, dict):
-                        continue
 
-                    if tool_input.get("file_path") == conftest_path_str:
-                        return True
+class ConftestInjector:
+    def __init__(
+        self,
+        project_root: Path,
+        transcript_path: str,
+        session_id: str | None = None,
+        fixture_index: FixtureIndex | None = None,
+    ) -> None:
+        self.project_root = project_root
+        self.transcript_path = Path(transcript_path)
+        self.session_id = session_id
+        self.fixture_index = fixture_index or FixtureIndex()
 
-            return False
+    @functools.cached_property
+    def _transcript(self) -> transcript.TranscriptSummary:
+        return transcript.scan(self.transcript_path, self.session_id)
 
-        except OSError:
-            return False
+    def _has_conftest_been_read(self, conftest_path: Path) -> bool:
+        return str(conftest_path) in self._transcript.read_paths
 
     def check_and_inject(self, conftest_info: ConftestInfo) -> str:
         path = conftest_info["path"]
@@ -360,13 +488,39 @@ class ConftestInjector:
         if self._has_conftest_been_read(full_path):
             return ""
 
-        warning_message = (
-            f"ACTION REQUIRED: Use Read tool to read CONFTEST immediately. READ NOW.\n"
-            f"You MUST read the following conftest file before proceeding with the test:\n"
-            f"{full_path}\n\n"
+        fixtures = None
+        if conftest_info["hash"] != "unknown":
+            fixtures = self.fixture_index.fixtures(full_path, conftest_info["hash"])
+
+        if not fixtures:
+            return (
+                f"ACTION REQUIRED: Use Read tool to read CONFTEST immediately. READ NOW.\n"
+                f"You MUST read the following conftest file before proceeding with the test:\n"
+                f"{full_path}\n\n"
+            )
+
+        fixture_lines = "\n".join(self._format_fixture(fixture) for fixture in fixtures)
+        return (
+            f"ACTION REQUIRED: Use Read tool to read the CONFTEST fixtures this test uses. READ NOW.\n"
+            f"You MUST read the fixtures you rely on from the following conftest before proceeding with the test:\n"
+            f"{full_path}\n"
+            f"Fixtures (Read with offset/limit instead of the whole file):\n"
+            f"{fixture_lines}\n\n"
         )
 
-        return warning_message
+    @staticmethod
+    def _format_fixture(fixture: FixtureInfo) -> str:
+        attributes = [fixture["scope"]]
+        if fixture["autouse"]:
+            attributes.append("autouse")
+        if fixture["params"]:
+            attributes.append(f"params={fixture['params']}")
+
+        start_line, end_line = fixture["start_line"], fixture["end_line"]
+        return (
+            f"- {fixture['name']} [{', '.join(attributes)}] "
+            f"lines {start_line}-{end_line} (offset={start_line}, limit={end_line - start_line + 1})"
+        )
 
 
 class HookHandler:
@@ -377,7 +531,7 @@ class HookHandler:
         hook_filename = Path(__file__).stem.replace("_", "-")
 
         try:
-            input_raw = sys.stdin.read()
+            input_raw = read_hook_input()
             if not input_raw:
                 print(f"[{hook_filename}] Skipping: No input provided")
                 sys.exit(0)
@@ -387,6 +541,11 @@ class HookHandler:
             print(f"[{hook_filename}] Skipping: Invalid input format")
             sys.exit(0)
 
+        self.handle_payload(data)
+
+    def handle_payload(self, data: PostToolUseInput) -> None:
+        hook_filename = Path(__file__).stem.replace("_", "-")
+
         tool_name = data["tool_name"]
         tool_input = data["tool_input"]
 
@@ -422,13 +581,14 @@ class HookHandler:
             print(f"[{hook_filename}] Success: No conftest files found")
             sys.exit(0)
 
-        injector = ConftestInjector(finder.project_root, transcript_path)
+        injector = ConftestInjector(finder.project_root, transcript_path, data.get("session_id"))
         messages_to_inject: list[str] = []
 
         for conftest_info in conftest_infos:
             message = injector.check_and_inject(conftest_info)
             if message:
                 messages_to_inject.append(message)
+        injector.fixture_index.save()
 
         if messages_to_inject:
             combined_message = "\n\n".join(messages_to_inject)
@@ -447,5 +607,10 @@ def main() -> None:
     handler.handle()
 
 
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, HookHandler().handle_payload, context)
+
+
 if __name__ == "__main__":
     main()
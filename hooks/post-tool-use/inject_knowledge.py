@@ -9,13 +9,18 @@
 
 from __future__ import annotations
 
-import hashlib
+import contextlib
+import functools
+import os
 import sys
-from datetime import datetime
+import tempfile
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
 import orjson
+from hooklib import project, transcript
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 
 
 class EditOperation(TypedDict):
@@ -104,28 +109,17 @@ class KnowledgeInfo(TypedDict):
     path: str
     distance: int
     type: str
-    hash: str
-    last_modified: str
 
 
 class KnowledgeFinder:
     KNOWLEDGE_FILES = ["claude.md", "agents.md", "readme.md"]
 
-    def __init__(self, file_path: str, cwd: str | None = None) -> None:
+    def __init__(
+        self, file_path: str, cwd: str | None = None, knowledge_index: KnowledgeIndex | None = None
+    ) -> None:
         self.file_path = Path(file_path).resolve()
-        self.project_root = Path(cwd).resolve() if cwd else self._find_project_root()
-
-    def _find_project_root(self) -> Path:
-        markers = [".git", "pyproject.toml", "package.json", ".venv"]
-        current = self.file_path.parent
-
-        while current != current.parent:
-            for marker in markers:
-                if (current / marker).exists():
-                    return current
-            current = current.parent
-
-        return self.file_path.parent
+        self.project_root = Path(cwd).resolve() if cwd else project.project_root(self.file_path.parent)
+        self.knowledge_index = knowledge_index or KnowledgeIndex()
 
     def find_knowledge_files(self) -> list[KnowledgeInfo]:
         if not self.project_root:
@@ -144,42 +138,23 @@ class KnowledgeFinder:
         while current_dir >= self.project_root and current_dir != current_dir.parent:
             # Skip project root as it's automatically read by the system
             if current_dir != self.project_root:
-                for file in current_dir.iterdir():
-                    if file.is_file() and file.name.lower() in self.KNOWLEDGE_FILES:
-                        try:
-                            relative_path = file.relative_to(self.project_root)
-                            path_str = str(relative_path)
-                        except ValueError:
-                            path_str = str(file)
-
-                        normalized_path = path_str.lower()
-                        if normalized_path not in seen_files:
-                            seen_files.add(normalized_path)
-                            file_type = (
-                                "claude" if "claude" in file.name.lower() else "agents"
-                            )
-
-                            try:
-                                file_content = file.read_bytes()
-                                file_hash = hashlib.sha256(file_content).hexdigest()[
-                                    :16
-                                ]
-                                last_modified = datetime.fromtimestamp(
-                                    file.stat().st_mtime
-                                ).isoformat()
-                            except OSError:
-                                file_hash = "unknown"
-                                last_modified = "unknown"
-
-                            knowledge_infos.append(
-                                KnowledgeInfo(
-                                    path=path_str,
-                                    distance=distance,
-                                    type=file_type,
-                                    hash=file_hash,
-                                    last_modified=last_modified,
-                                )
+                for name in self.knowledge_index.knowledge_files(current_dir):
+                    file = current_dir / name
+                    try:
+                        path_str = str(file.relative_to(self.project_root))
+                    except ValueError:
+                        path_str = str(file)
+
+                    normalized_path = path_str.lower()
+                    if normalized_path not in seen_files:
+                        seen_files.add(normalized_path)
+                        knowledge_infos.append(
+                            KnowledgeInfo(
+                                path=path_str,
+                                distance=distance,
+                                type="claude" if "claude" in name.lower() else "agents",
                             )
+                        )
 
             if current_dir == self.project_root:
                 break
@@ -187,69 +162,100 @@ class KnowledgeFinder:
             current_dir = current_dir.parent
             distance += 1
 
+        self.knowledge_index.save()
         return sorted(knowledge_infos, key=lambda x: x["distance"])
 
 
-class KnowledgeInjector:
-    def __init__(self, project_root: Path, transcript_path: str) -> None:
-        self.project_root = project_root
-        self.transcript_path = Path(transcript_path)
-
-    def _has_knowledge_been_read(self, knowledge_path: Path) -> bool:
-        if not self.transcript_path.exists():
-            return False
-
-        try:
-            knowledge_path_str = str(knowledge_path)
-            transcript_content = self.transcript_path.read_text(encoding="utf-8")
-
-            for line in transcript_content.splitlines():
-                if not line.strip():
-                    continue
-
-                try:
-                    entry: RawTranscriptEntry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if not isinstance(entry, dict):
-                    continue
-
-                if entry.get("type") != "assistant":
-                    continue
+class KnowledgeIndex:
+    """On-disk listing of the knowledge files in each directory.
 
-                message = entry.get("message")
-                if not isinstance(message, dict):
-                    continue
+    Each entry carries the directory's mtime, which changes whenever a file is
+    created, deleted or renamed in it, so a directory seen before costs one stat()
+    instead of an iterdir() plus a stat() per entry. Knowledge files are never
+    opened here; whether to inject one only depends on its path.
+    """
 
-                if message.get("role") != "assistant":
-                    continue
+    INDEX_PATH = Path.home() / ".claude" / "cache" / "knowledge-index.json"
+    VERSION = 1
+    # Directories remembered at once; the oldest entries are dropped first
+    MAX_DIRS = 4096
 
-                content = message.get("content")
-                if not isinstance(content, list):
-                    continue
+    def __init__(self, index_path: Path | None = None) -> None:
+        self.index_path = index_path or self.INDEX_PATH
+        self._dirty = False
 
-                for block in content:
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use":
-                        continue
+    @functools.cached_property
+    def _dirs(self) -> dict[str, dict[str, Any]]:
+        try:
+            data = orjson.loads(self.index_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            data = None
+
+        match data:
+            case {"version": self.VERSION, "dirs": dict(dirs)}:
+                return dirs
+            case _:
+                return {}
+
+    def knowledge_files(self, directory: Path) -> list[str]:
+        """Return the names of the knowledge files in directory, listing it only if it changed."""
+        key = str(directory)
+        try:
+            mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            return []
 
-                    if block.get("name") != "Read":
-                        continue
+        match self._dirs.get(key):
+            case {"mtime_ns": cached_mtime, "files": list(names)} if cached_mtime == mtime_ns:
+                return names
+
+        names = []
+        with contextlib.suppress(OSError), os.scandir(key) as entries:
+            names = sorted(
+                entry.name
+                for entry in entries
+                if entry.name.lower() in KnowledgeFinder.KNOWLEDGE_FILES and entry.is_file()
+            )
+
+        self._dirs.pop(key, None)
+        self._dirs[key] = {"mtime_ns": mtime_ns, "files": names}
+        self._dirty = True
+        return names
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        dirs = self._dirs
+        for key in list(dirs)[: max(len(dirs) - self.MAX_DIRS, 0)]:
+            del dirs[key]
+        data = orjson.dumps({"version": self.VERSION, "dirs": dirs})
+
+        with contextlib.suppress(OSError):
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.index_path.parent, prefix=".knowledge-index-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self.index_path)
+            except OSError:
+                Path(temp_path).unlink(missing_ok=True)
+        self._dirty = False
 
-                    tool_input = block.get("input")
-                    if not isinstance(tool_input, dict):
-                        continue
 
-                    if tool_input.get("file_path") == knowledge_path_str:
-                        return True
+class KnowledgeInjector:
+    def __init__(self, project_root: Path, transcript_path: str, session_id: str | None = None) -> None:
+        self.project_root = project_root
+        self.transcript_path = Path(transcript_path)
+        self.session_id = session_id
 
-            return False
+    @functools.cached_property
+    def _transcript(self) -> transcript.TranscriptSummary:
+        """Scanned once, not once per knowledge file checked."""
+        return transcript.scan(self.transcript_path, self.session_id)
 
-        except OSError:
-            return False
+    def _has_knowledge_been_read(self, knowledge_path: Path) -> bool:
+        return str(knowledge_path) in self._transcript.read_paths
 
     def check_and_inject(self, knowledge_info: KnowledgeInfo) -> str:
         path = knowledge_info["path"]
@@ -278,7 +284,7 @@ class HookHandler:
         hook_filename = Path(__file__).stem.replace("_", "-")
 
         try:
-            input_raw = sys.stdin.read()
+            input_raw = read_hook_input()
             if not input_raw:
                 print(f"[{hook_filename}] Skipping: No input provided")
                 sys.exit(0)
@@ -288,6 +294,11 @@ class HookHandler:
             print(f"[{hook_filename}] Skipping: Invalid input format")
             sys.exit(0)
 
+        self.handle_payload(data)
+
+    def handle_payload(self, data: PostToolUseInput) -> None:
+        hook_filename = Path(__file__).stem.replace("_", "-")
+
         tool_name = data["tool_name"]
         tool_input = data["tool_input"]
 
@@ -342,7 +353,7 @@ class HookHandler:
             print(f"[{hook_filename}] Success: No relevant knowledge files found")
             sys.exit(0)
 
-        injector = KnowledgeInjector(finder.project_root, transcript_path)
+        injector = KnowledgeInjector(finder.project_root, transcript_path, data.get("session_id"))
         messages_to_inject: list[str] = []
 
         for knowledge_info in filtered_knowledge_infos:
@@ -367,5 +378,10 @@ def main() -> None:
     handler.handle()
 
 
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, HookHandler().handle_payload, context)
+
+
 if __name__ == "__main__":
     main()
@@ -9,11 +9,15 @@
 
 from __future__ import annotations
 
+import functools
 import sys
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
 import orjson
+from hooklib import transcript
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 
 
 class ReadToolInput(TypedDict):
@@ -94,9 +98,10 @@ class LanguageGuideChecker:
 
     MODULAR_PROMPTS_DIR = Path.home() / ".claude" / "modular-prompts" / "languages"
 
-    def __init__(self, cwd: str, transcript_path: str) -> None:
+    def __init__(self, cwd: str, transcript_path: str, session_id: str | None = None) -> None:
         self.cwd = Path(cwd)
         self.transcript_path = Path(transcript_path)
+        self.session_id = session_id
 
     def _get_guide_path(self, extension: str) -> Path | None:
         if not extension or not extension.startswith("."):
@@ -119,61 +124,12 @@ class LanguageGuideChecker:
     def _get_guide_identifier(self, guide_content: str, guide_filename: str) -> str:
         return f"[language-guide:{guide_filename}]"
 
-    def _has_guide_been_read(self, guide_path: Path) -> bool:
-        if not self.transcript_path.exists():
-            return False
-
-        try:
-            guide_path_str = str(guide_path)
-            transcript_content = self.transcript_path.read_text(encoding="utf-8")
-
-            for line in transcript_content.splitlines():
-                if not line.strip():
-                    continue
-
-                try:
-                    entry: RawTranscriptEntry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if not isinstance(entry, dict):
-                    continue
-
-                if entry.get("type") != "assistant":
-                    continue
-
-                message = entry.get("message")
-                if not isinstance(message, dict):
-                    continue
-
-                if message.get("role") != "assistant":
-                    continue
-
-                content = message.get("content")
-                if not isinstance(content, list):
-                    continue
-
-                for block in content:
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use":
-                        continue
+    @functools.cached_property
+    def _transcript(self) -> transcript.TranscriptSummary:
+        return transcript.scan(self.transcript_path, self.session_id)
 
-                    if block.get("name") != "Read":
-                        continue
-
-                    tool_input = block.get("input")
-                    if not isinstance(tool_input, dict):
-                        continue
-
-                    if tool_input.get("file_path") == guide_path_str:
-                        return True
-
-            return False
-
-        except OSError:
-            return False
+    def _has_guide_been_read(self, guide_path: Path) -> bool:
+        return str(guide_path) in self._transcript.read_paths
 
     def check_and_inject(self, file_path: str) -> str:
         path = Path(file_path)
@@ -207,7 +163,7 @@ def main() -> None:
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
     try:
-        input_raw = sys.stdin.read()
+        input_raw = read_hook_input()
         if not input_raw:
             print(f"[{hook_filename}] Skipping: No input provided")
             sys.exit(0)
@@ -217,6 +173,17 @@ def main() -> None:
         print(f"[{hook_filename}] Skipping: Invalid input format")
         sys.exit(0)
 
+    handle_payload(data)
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    hook_filename = Path(__file__).stem.replace("_", "-")
+
     tool_input = data["tool_input"]
     file_path = tool_input.get("file_path", "")
 
@@ -231,7 +198,7 @@ def main() -> None:
     cwd = data["cwd"]
     transcript_path = data["transcript_path"]
 
-    checker = LanguageGuideChecker(cwd, transcript_path)
+    checker = LanguageGuideChecker(cwd, transcript_path, data.get("session_id"))
     message = checker.check_and_inject(file_path)
 
     if message:
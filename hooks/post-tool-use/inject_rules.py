@@ -13,15 +13,24 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import fcntl
+import functools
 import hashlib
+import os
 import re
 import sys
+import tempfile
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
 import aiofiles
 import orjson
 import yaml
+from hooklib import project, transcript
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 from wcmatch import glob
 
 
@@ -69,33 +78,28 @@ class RuleMetadata(TypedDict):
     alwaysApply: NotRequired[bool]
 
 
+class RuleFileEntry(TypedDict):
+    size: int
+    mtime_ns: int
+    metadata: RuleMetadata
+    content_hash: NotRequired[str]
+
+
 class RuleInfo(TypedDict):
     path: Path
     relative_path: str
     distance: int
-    content: str
     content_hash: str
     metadata: RuleMetadata
     match_reason: str
 
 
 class RuleFinder:
-    def __init__(self, cwd: Path) -> None:
+    def __init__(self, cwd: Path, rule_index: RuleIndex | None = None) -> None:
         self.cwd = cwd
-        self.project_root = self._find_project_root()
+        self.project_root = project.project_root(cwd)
         self.user_rules_dir = Path.home() / ".claude" / "modular-prompts"
-
-    def _find_project_root(self) -> Path:
-        markers = [".git", "pyproject.toml", "package.json", ".venv"]
-        current = self.cwd
-
-        while current != current.parent:
-            for marker in markers:
-                if (current / marker).exists():
-                    return current
-            current = current.parent
-
-        return self.cwd
+        self.rule_index = rule_index or RuleIndex()
 
     def find_rule_files(self, current_file_path: Path) -> list[tuple[Path, int]]:
         candidates: list[tuple[Path, int]] = []
@@ -109,17 +113,13 @@ class RuleFinder:
             if not rule_dir.exists():
                 continue
 
-            for pattern in ["**/*.mdc", "**/*.md"]:
-                for rule_file in rule_dir.glob(pattern):
-                    if rule_file.is_file():
-                        distance = self._calculate_distance(rule_file, current_file_path)
-                        candidates.append((rule_file, distance))
+            for rule_file in self.rule_index.rule_files(rule_dir):
+                distance = self._calculate_distance(rule_file, current_file_path)
+                candidates.append((rule_file, distance))
 
         if self.user_rules_dir.exists():
-            for pattern in ["**/*.mdc", "**/*.md"]:
-                for rule_file in self.user_rules_dir.glob(pattern):
-                    if rule_file.is_file():
-                        candidates.append((rule_file, 9999))
+            for rule_file in self.rule_index.rule_files(self.user_rules_dir):
+                candidates.append((rule_file, 9999))
 
         candidates.sort(key=lambda x: x[1])
 
@@ -152,6 +152,8 @@ class RuleFinder:
 
 
 class RuleParser:
+    FENCE_PATTERN = re.compile(r"^---\s*$")
+
     @staticmethod
     def parse_frontmatter(content: str) -> tuple[RuleMetadata, str]:
         pattern = r"^---\s*\n(.*?)\n---\s*\n(.*)$"
@@ -163,20 +165,254 @@ class RuleParser:
         yaml_str = match.group(1)
         markdown = match.group(2)
 
+        return RuleParser.parse_metadata(yaml_str), markdown
+
+    @staticmethod
+    async def read_frontmatter(rule_path: Path) -> RuleMetadata:
+        """Read a rule's metadata, stopping at the closing `---` instead of loading the body."""
+        async with aiofiles.open(rule_path, encoding="utf-8") as f:
+            if not RuleParser._is_fence(await f.readline()):
+                return RuleMetadata()
+
+            yaml_lines: list[str] = []
+            async for line in f:
+                if RuleParser._is_fence(line):
+                    return RuleParser.parse_metadata("".join(yaml_lines))
+                yaml_lines.append(line)
+
+        return RuleMetadata()
+
+    @staticmethod
+    def parse_metadata(yaml_str: str) -> RuleMetadata:
         try:
             metadata = yaml.safe_load(yaml_str) or {}
         except yaml.YAMLError:
             metadata = {}
 
+        if not isinstance(metadata, dict):
+            metadata = {}
+
         if "globs" in metadata and isinstance(metadata["globs"], str):
             metadata["globs"] = [g.strip() for g in metadata["globs"].split(",") if g.strip()]
 
-        return RuleMetadata(**metadata), markdown
+        return RuleMetadata(**metadata)
 
+    @staticmethod
+    def _is_fence(line: str) -> bool:
+        # Like parse_frontmatter, a fence only counts when a newline follows it
+        return line.endswith("\n") and RuleParser.FENCE_PATTERN.match(line) is not None
+
+
+class RuleIndex:
+    """On-disk index of rule directories and rule files.
+
+    For each rule directory it keeps the rule file list together with the mtime of
+    every directory in the tree, so the list is reused until a file is added,
+    removed or renamed somewhere below it. For each rule file it keeps the
+    frontmatter-stripped content hash and parsed metadata keyed by
+    (realpath, size, mtime_ns), so an unchanged rule costs one stat() instead of a
+    read, a frontmatter parse and a sha256. The translated GlobMatcher source for
+    each set of rule globs is kept too, and only rebuilt when the globs change.
+    """
+
+    INDEX_PATH = Path.home() / ".claude" / "cache" / "rule-index.json"
+    VERSION = 2
+    # Compiled glob sets kept at once, enough for the handful of projects in use
+    MAX_GLOB_MATCHERS = 16
+
+    def __init__(self, index_path: Path | None = None) -> None:
+        self.index_path = index_path or self.INDEX_PATH
+        self._dirty = False
+
+    @functools.cached_property
+    def _data(self) -> dict[str, dict[str, Any]]:
+        try:
+            data = orjson.loads(self.index_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            data = None
+
+        match data:
+            case {"version": self.VERSION, "dirs": dict(dirs), "files": dict(files), "glob_matchers": dict(matchers)}:
+                return {"dirs": dirs, "files": files, "glob_matchers": matchers}
+            case _:
+                return {"dirs": {}, "files": {}, "glob_matchers": {}}
+
+    def rule_files(self, rule_dir: Path) -> list[Path]:
+        """Return the .mdc and .md files below rule_dir, walking it only if the tree changed."""
+        key = str(rule_dir)
+        match self._data["dirs"].get(key):
+            case {"tree": dict(tree), "files": list(files)} if self._tree_unchanged(tree):
+                return [Path(path) for path in files]
+
+        tree: dict[str, int] = {}
+        found: dict[str, list[str]] = {".mdc": [], ".md": []}
+        for dirpath, _dirnames, filenames in os.walk(rule_dir, followlinks=True):
+            try:
+                tree[dirpath] = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            for filename in filenames:
+                suffix = os.path.splitext(filename)[1]
+                path = os.path.join(dirpath, filename)
+                if suffix in found and os.path.isfile(path):
+                    found[suffix].append(path)
+
+        files = sorted(found[".mdc"]) + sorted(found[".md"])
+        self._data["dirs"][key] = {"tree": tree, "files": files}
+        self._dirty = True
+        return [Path(path) for path in files]
 
-class RuleMatcher:
     @staticmethod
-    def should_apply(rule_metadata: RuleMetadata, current_file_path: Path, cwd: Path) -> str | None:
+    def _tree_unchanged(tree: dict[str, Any]) -> bool:
+        for dirpath, mtime_ns in tree.items():
+            try:
+                if os.stat(dirpath).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return bool(tree)
+
+    async def metadata(self, rule_path: Path) -> RuleMetadata | None:
+        """Return a rule's frontmatter, reading the file only up to its closing fence.
+
+        Returns:
+            The parsed metadata, or None if the file cannot be read
+        """
+        current = self._current_entry(rule_path)
+        if current is None:
+            return None
+        key, stat, entry = current
+        if entry is not None:
+            return RuleMetadata(**entry["metadata"])
+
+        try:
+            metadata = await RuleParser.read_frontmatter(Path(key))
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        self._data["files"][key] = RuleFileEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, metadata=metadata)
+        self._dirty = True
+        return metadata
+
+    async def content_hash(self, rule_path: Path) -> str | None:
+        """Return the hash of a rule's frontmatter-stripped body, the only reason to read all of it.
+
+        Returns:
+            The hash, or None if the file cannot be read
+        """
+        current = self._current_entry(rule_path)
+        if current is None:
+            return None
+        key, stat, entry = current
+        if entry is not None and "content_hash" in entry:
+            return entry["content_hash"]
+
+        try:
+            async with aiofiles.open(key, encoding="utf-8") as f:
+                content = await f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        metadata, markdown = RuleParser.parse_frontmatter(content)
+        content_hash = hashlib.sha256(markdown.strip().encode("utf-8")).hexdigest()[:16]
+        self._data["files"][key] = RuleFileEntry(
+            size=stat.st_size, mtime_ns=stat.st_mtime_ns, metadata=metadata, content_hash=content_hash
+        )
+        self._dirty = True
+        return content_hash
+
+    def _current_entry(self, rule_path: Path) -> tuple[str, os.stat_result, RuleFileEntry | None] | None:
+        """Resolve and stat a rule file, pairing it with its entry if that is still valid."""
+        try:
+            real_path = rule_path.resolve()
+            stat = real_path.stat()
+        except OSError:
+            return None
+
+        key = str(real_path)
+        match self._data["files"].get(key):
+            case {"size": size, "mtime_ns": mtime_ns, "metadata": dict()} as entry:
+                if (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                    return key, stat, RuleFileEntry(**entry)
+        return key, stat, None
+
+    def glob_matcher(self, globs: Iterable[str]) -> GlobMatcher:
+        """Return the compiled matcher for these globs, translating them only if this set is new."""
+        patterns = sorted(set(globs))
+        key = hashlib.sha256("\0".join(patterns).encode("utf-8")).hexdigest()[:16]
+        matchers = self._data["glob_matchers"]
+
+        match matchers.pop(key, None):
+            case {"globs": list(cached), "source": str(source)} if cached == patterns:
+                pass
+            case _:
+                source = GlobMatcher.translate(patterns)
+                self._dirty = True
+
+        # Re-inserted last, so eviction below drops the least recently used sets
+        matchers[key] = {"globs": patterns, "source": source}
+        while len(matchers) > self.MAX_GLOB_MATCHERS:
+            del matchers[next(iter(matchers))]
+        return GlobMatcher(patterns, source)
+
+    def save(self) -> None:
+        """Persist changes, dropping entries whose file or directory is gone."""
+        if not self._dirty:
+            return
+
+        index = {
+            "version": self.VERSION,
+            "dirs": {key: entry for key, entry in self._data["dirs"].items() if os.path.isdir(key)},
+            "files": {key: entry for key, entry in self._data["files"].items() if os.path.exists(key)},
+            "glob_matchers": self._data["glob_matchers"],
+        }
+        try:
+            data = orjson.dumps(index, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return
+
+        with contextlib.suppress(OSError):
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.index_path.parent, prefix=".rule-index-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self.index_path)
+            except OSError:
+                Path(temp_path).unlink(missing_ok=True)
+        self._dirty = False
+
+
+class GlobMatcher:
+    """Every rule glob compiled into one regex, matched against a path in a single pass.
+
+    Each glob becomes an optional lookahead with its own capture group at the start
+    of the path, so one match reports every glob that matches instead of only the
+    first alternative.
+    """
+
+    def __init__(self, globs: list[str], source: str) -> None:
+        self.globs = globs
+        self._regex = re.compile(source)
+
+    @staticmethod
+    def translate(globs: list[str]) -> str:
+        include, _exclude = glob.translate(globs, flags=glob.GLOBSTAR)
+        return "".join(f"(?=(?P<g{i}>{regex.removeprefix('^')}))?" for i, regex in enumerate(include))
+
+    def matching(self, path: str) -> set[str]:
+        match = self._regex.match(path)
+        if match is None:
+            return set()
+        return {pattern for i, pattern in enumerate(self.globs) if match.group(f"g{i}") is not None}
+
+
+class RuleMatcher:
+    def __init__(self, glob_matcher: GlobMatcher) -> None:
+        self.glob_matcher = glob_matcher
+        self._matching_globs: dict[str, set[str]] = {}
+
+    def should_apply(self, rule_metadata: RuleMetadata, current_file_path: Path, cwd: Path) -> str | None:
         if rule_metadata.get("alwaysApply"):
             return "alwaysApply"
 
@@ -190,16 +426,22 @@ class RuleMatcher:
             return None
 
         relative_path_str = str(relative_path)
+        if relative_path_str not in self._matching_globs:
+            self._matching_globs[relative_path_str] = self.glob_matcher.matching(relative_path_str)
+
+        matching = self._matching_globs[relative_path_str]
         for glob_pattern in globs:
-            if glob.globmatch(relative_path_str, glob_pattern, flags=glob.GLOBSTAR):
+            if glob_pattern in matching:
                 return f"glob: {glob_pattern}"
 
         return None
 
 
 class TranscriptAnalyzer:
-    def __init__(self, transcript_path: Path) -> None:
+    def __init__(self, transcript_path: Path, rule_index: RuleIndex, session_id: str | None = None) -> None:
         self.transcript_path = transcript_path
+        self.rule_index = rule_index
+        self.session_id = session_id
         self._read_contents_cache: tuple[dict[str, str], set[str]] | None = None
 
     async def get_already_read_rule_contents(self) -> tuple[dict[str, str], set[str]]:
@@ -211,98 +453,51 @@ class TranscriptAnalyzer:
         if self._read_contents_cache is not None:
             return self._read_contents_cache
 
-        if not self.transcript_path.exists():
-            self._read_contents_cache = ({}, set())
-            return ({}, set())
-
         read_files: dict[str, str] = {}
         read_hashes: set[str] = set()
 
-        try:
-            async with aiofiles.open(self.transcript_path, encoding="utf-8") as f:
-                content = await f.read()
-
-            for line in content.splitlines():
-                if not line.strip():
-                    continue
-
-                try:
-                    entry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if not isinstance(entry, dict) or entry.get("type") != "assistant":
-                    continue
-
-                message = entry.get("message", {})
-                if message.get("role") != "assistant":
-                    continue
-
-                for block in message.get("content", []):
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use" or block.get("name") != "Read":
-                        continue
-
-                    tool_input = block.get("input", {})
-                    file_path = tool_input.get("file_path")
-
-                    if not file_path:
-                        continue
-
-                    if not (file_path.endswith(".md") or file_path.endswith(".mdc")):
-                        continue
+        summary = await asyncio.to_thread(transcript.scan, self.transcript_path, self.session_id)
+        for file_path in sorted(summary.read_paths):
+            if not (file_path.endswith(".md") or file_path.endswith(".mdc")):
+                continue
 
-                    try:
-                        path = Path(file_path)
-                        if path.exists():
-                            real_path = path.resolve()
-                            content_hash = await self._hash_file_content(real_path)
-                            read_files[str(real_path)] = content_hash
-                            read_hashes.add(content_hash)
-                    except OSError:
-                        pass
-
-        except OSError:
-            pass
+            try:
+                path = Path(file_path)
+                if path.exists():
+                    real_path = path.resolve()
+                    content_hash = await self._hash_file_content(real_path)
+                    read_files[str(real_path)] = content_hash
+                    read_hashes.add(content_hash)
+            except OSError:
+                pass
 
         self._read_contents_cache = (read_files, read_hashes)
         return (read_files, read_hashes)
 
-    @staticmethod
-    async def _hash_file_content(file_path: Path) -> str:
-        try:
-            async with aiofiles.open(file_path, encoding="utf-8") as f:
-                content = await f.read()
-
-            _, markdown = RuleParser.parse_frontmatter(content)
-            stripped = markdown.strip()
-            return hashlib.sha256(stripped.encode("utf-8")).hexdigest()[:16]
-        except OSError:
-            return "error"
+    async def _hash_file_content(self, file_path: Path) -> str:
+        content_hash = await self.rule_index.content_hash(file_path)
+        return content_hash if content_hash is not None else "error"
 
 
 async def process_single_rule_file(
     rule_path: Path,
     distance: int,
+    metadata: RuleMetadata,
     current_file_path: Path,
     cwd: Path,
     already_read_contents: tuple[dict[str, str], set[str]],
+    matcher: RuleMatcher,
+    rule_index: RuleIndex,
 ) -> RuleInfo | None:
     try:
-        async with aiofiles.open(rule_path, encoding="utf-8") as f:
-            content = await f.read()
-
-        metadata, markdown = RuleParser.parse_frontmatter(content)
-
-        matcher = RuleMatcher()
         match_reason = matcher.should_apply(metadata, current_file_path, cwd)
 
         if not match_reason:
             return None
 
-        content_hash = hashlib.sha256(markdown.strip().encode("utf-8")).hexdigest()[:16]
+        content_hash = await rule_index.content_hash(rule_path)
+        if content_hash is None:
+            return None
 
         already_read_paths, already_read_hashes = already_read_contents
 
@@ -325,7 +520,6 @@ async def process_single_rule_file(
             path=rule_path,
             relative_path=relative_path,
             distance=distance,
-            content=content,
             content_hash=content_hash,
             metadata=metadata,
             match_reason=match_reason,
@@ -335,11 +529,142 @@ async def process_single_rule_file(
         return None
 
 
+class TodoStore:
+    """Session todo file shared with Claude Code, updated in batches.
+
+    Additions and completions queued during one hook invocation are applied
+    together under an advisory lock on a sidecar .lock file and written with a
+    temp file + rename, so concurrent hooks and sessions neither lose each other's
+    changes nor see a torn file. Once the todo file passes JOURNAL_THRESHOLD_BYTES,
+    batches that only complete todos are appended to a .journal file instead and
+    folded into the todo file every JOURNAL_COMPACT_OPS operations. Claude Code only
+    reads the todo file, so a batch that adds a todo always rewrites it, folding in
+    the journal on the way.
+    """
+
+    JOURNAL_THRESHOLD_BYTES = 256 * 1024
+    JOURNAL_COMPACT_OPS = 50
+
+    def __init__(self, todo_file: Path) -> None:
+        self.todo_file = todo_file
+        self.journal_file = todo_file.with_name(f"{todo_file.name}.journal")
+        self.lock_file = todo_file.with_name(f"{todo_file.name}.lock")
+        self._pending: list[dict[str, Any]] = []
+
+    def add(self, item: dict[str, Any]) -> None:
+        """Queue a todo to insert at the top, unless one with the same id exists."""
+        self._pending.append({"op": "add", "item": item})
+
+    def complete(self, todo_id: str) -> None:
+        self._pending.append({"op": "complete", "id": todo_id})
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        ops, self._pending = self._pending, []
+
+        try:
+            self.todo_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._locked():
+                journal = self._read_journal()
+                adds_todos = any(op["op"] == "add" for op in ops)
+                has_additions = adds_todos or any(op["op"] == "add" for op in journal)
+                if not has_additions and not self.todo_file.exists():
+                    return
+
+                if (
+                    not adds_todos
+                    and self._in_journal_mode()
+                    and len(journal) + len(ops) < self.JOURNAL_COMPACT_OPS
+                ):
+                    with open(self.journal_file, "ab") as f:
+                        f.write(b"".join(orjson.dumps(op) + b"\n" for op in ops))
+                    return
+
+                todos = self._read_todos()
+                if todos is None:
+                    if not has_additions:
+                        return
+                    todos = []
+
+                self._write_atomic(self._apply(todos, [*journal, *ops]))
+                self.journal_file.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        # The todo file itself is replaced on every write, so the lock lives on a sidecar
+        with open(self.lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _in_journal_mode(self) -> bool:
+        try:
+            return self.todo_file.stat().st_size >= self.JOURNAL_THRESHOLD_BYTES
+        except OSError:
+            return False
+
+    def _read_todos(self) -> list[Any] | None:
+        try:
+            todos = orjson.loads(self.todo_file.read_bytes())
+        except FileNotFoundError:
+            return []
+        except (orjson.JSONDecodeError, OSError):
+            return None
+        return todos if isinstance(todos, list) else None
+
+    def _read_journal(self) -> list[dict[str, Any]]:
+        try:
+            lines = self.journal_file.read_bytes().splitlines()
+        except OSError:
+            return []
+
+        ops: list[dict[str, Any]] = []
+        for line in lines:
+            try:
+                op = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(op, dict) and op.get("op") in ("add", "complete"):
+                ops.append(op)
+        return ops
+
+    @staticmethod
+    def _apply(todos: list[Any], ops: list[dict[str, Any]]) -> list[Any]:
+        for op in ops:
+            match op:
+                case {"op": "add", "item": {"id": todo_id} as item}:
+                    if not any(isinstance(todo, dict) and todo.get("id") == todo_id for todo in todos):
+                        todos.insert(0, item)
+                case {"op": "complete", "id": todo_id}:
+                    for todo in todos:
+                        if isinstance(todo, dict) and todo.get("id") == todo_id:
+                            todo["status"] = "completed"
+                            break
+        return todos
+
+    def _write_atomic(self, todos: list[Any]) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.todo_file.parent, prefix=f".{self.todo_file.name}-", suffix=".tmp")
+        try:
+            try:
+                os.fchmod(fd, self.todo_file.stat().st_mode & 0o777)
+            except FileNotFoundError:
+                os.fchmod(fd, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(todos, option=orjson.OPT_INDENT_2))
+            os.replace(temp_path, self.todo_file)
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+
 class RuleInjector:
     TODOS_DIR = Path.home() / ".claude" / "todos"
 
     def __init__(self, session_id: str) -> None:
         self.session_id = session_id
+        self.todo_store = TodoStore(self.TODOS_DIR / f"{session_id}-agent-{session_id}.json")
 
     def _generate_todo_id(self, rule_info: RuleInfo) -> str:
         safe_path = rule_info["relative_path"].replace("/", "-").replace(".", "-")
@@ -354,59 +679,20 @@ class RuleInjector:
         return f"read-rule-{safe_path}"
 
     def _mark_todo_completed(self, todo_id: str) -> None:
-        self.TODOS_DIR.mkdir(parents=True, exist_ok=True)
-        todo_file = self.TODOS_DIR / f"{self.session_id}-agent-{self.session_id}.json"
-
-        if not todo_file.exists():
-            return
-
-        try:
-            todos = orjson.loads(todo_file.read_bytes())
-        except (orjson.JSONDecodeError, OSError):
-            return
-
-        for todo in todos:
-            if todo.get("id") == todo_id:
-                if todo.get("status") != "completed":
-                    todo["status"] = "completed"
-                break
-
-        try:
-            todo_file.write_bytes(orjson.dumps(todos, option=orjson.OPT_INDENT_2))
-        except OSError:
-            pass
+        self.todo_store.complete(todo_id)
 
     def add_todo_item(self, rule_info: RuleInfo) -> None:
-        self.TODOS_DIR.mkdir(parents=True, exist_ok=True)
-        todo_file = self.TODOS_DIR / f"{self.session_id}-agent-{self.session_id}.json"
-
-        try:
-            if todo_file.exists():
-                todos = orjson.loads(todo_file.read_bytes())
-            else:
-                todos = []
-        except (orjson.JSONDecodeError, OSError):
-            todos = []
-
-        todo_id = self._generate_todo_id(rule_info)
-
-        for existing in todos:
-            if existing.get("id") == todo_id:
-                return
-
         todo_item = {
             "content": f"Read rule: {rule_info['path']} ({rule_info['match_reason']})",
             "status": "pending",
             "priority": "high",
-            "id": todo_id,
+            "id": self._generate_todo_id(rule_info),
         }
+        self.todo_store.add(todo_item)
 
-        todos.insert(0, todo_item)
-
-        try:
-            todo_file.write_bytes(orjson.dumps(todos, option=orjson.OPT_INDENT_2))
-        except OSError:
-            pass
+    def flush(self) -> None:
+        """Write every queued todo change in one locked, atomic update."""
+        self.todo_store.flush()
 
 
 class HookHandler:
@@ -414,7 +700,7 @@ class HookHandler:
         hook_filename = Path(__file__).stem.replace("_", "-")
 
         try:
-            input_raw = sys.stdin.read()
+            input_raw = read_hook_input()
             if not input_raw:
                 print(f"[{hook_filename}] Skipping: No input provided")
                 sys.exit(0)
@@ -424,6 +710,11 @@ class HookHandler:
             print(f"[{hook_filename}] Skipping: Invalid input format")
             sys.exit(0)
 
+        await self.handle_payload(data)
+
+    async def handle_payload(self, data: PostToolUseInput) -> None:
+        hook_filename = Path(__file__).stem.replace("_", "-")
+
         tool_name = data["tool_name"]
         tool_input = data["tool_input"]
 
@@ -466,6 +757,7 @@ class HookHandler:
                     injector = RuleInjector(session_id)
                     todo_id = injector._generate_todo_id_from_path(current_file_path, finder.project_root)
                     injector._mark_todo_completed(todo_id)
+                    injector.flush()
 
                     print(f"[{hook_filename}] Success: Rule todo completed")
                     sys.exit(0)
@@ -473,22 +765,44 @@ class HookHandler:
                     continue
 
         transcript_path = Path(data["transcript_path"])
-        finder = RuleFinder(cwd)
+        rule_index = RuleIndex()
+        finder = RuleFinder(cwd, rule_index)
         rule_candidates = finder.find_rule_files(current_file_path)
 
         if not rule_candidates:
             print(f"[{hook_filename}] Success: No rule files found")
             sys.exit(0)
 
-        analyzer = TranscriptAnalyzer(transcript_path)
+        analyzer = TranscriptAnalyzer(transcript_path, rule_index, session_id)
         already_read = await analyzer.get_already_read_rule_contents()
 
+        # Frontmatter is enough to decide a match; bodies are only read for rules that match
+        rule_metadata = await asyncio.gather(
+            *(rule_index.metadata(rule_path) for rule_path, _distance in rule_candidates), return_exceptions=True
+        )
+        parsed_candidates = [
+            (rule_path, distance, metadata)
+            for (rule_path, distance), metadata in zip(rule_candidates, rule_metadata, strict=True)
+            if isinstance(metadata, dict)
+        ]
+        matcher = RuleMatcher(
+            rule_index.glob_matcher(
+                pattern
+                for _rule_path, _distance, metadata in parsed_candidates
+                for pattern in metadata.get("globs", [])
+                if isinstance(pattern, str)
+            )
+        )
+
         tasks = [
-            process_single_rule_file(rule_path, distance, current_file_path, cwd, already_read)
-            for rule_path, distance in rule_candidates
+            process_single_rule_file(
+                rule_path, distance, metadata, current_file_path, cwd, already_read, matcher, rule_index
+            )
+            for rule_path, distance, metadata in parsed_candidates
         ]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        rule_index.save()
 
         rules_to_inject: list[RuleInfo] = []
         for result in results:
@@ -519,6 +833,8 @@ class HookHandler:
             )
             messages.append(message)
 
+        injector.flush()
+
         combined_message = "\n\n".join(messages)
         print(combined_message, file=sys.stderr)
         sys.exit(2)
@@ -532,5 +848,10 @@ async def main() -> None:
     await handler.handle()
 
 
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, HookHandler().handle_payload, context)
+
+
 if __name__ == "__main__":
     asyncio.run(main())
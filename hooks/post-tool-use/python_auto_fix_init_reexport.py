@@ -19,6 +19,8 @@ from pathlib import Path
 from typing import Any, NoReturn, TypedDict
 
 import ast_grep_py as sg  # type: ignore[import-not-found]  # pyright: ignore[reportMissingImports]
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 
 EXIT_CODE_BLOCK_TOOL: int = 2
 
@@ -67,15 +69,24 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
+    _run_pipeline(parse_input())
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, _run_pipeline, context)
+
+
+def _run_pipeline(data: PostToolUseInput) -> None:
     try:
-        _execute_hook_pipeline()
+        _execute_hook_pipeline(data)
     except Exception:
         _handle_hook_error()
 
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw: str = sys.stdin.read()
+    input_raw: str = read_hook_input()
     if not input_raw:
         print("[auto-fix-init-reexport] Skipping: No input provided")
         sys.exit(0)
@@ -149,9 +160,8 @@ def process_and_fix(data: PostToolUseInput) -> bool:
         return False
 
 
-def _execute_hook_pipeline() -> NoReturn:
+def _execute_hook_pipeline(data: PostToolUseInput) -> NoReturn:
     """Execute the main hook logic pipeline."""
-    data: PostToolUseInput = parse_input()
     if not should_process(data):
         print("[auto-fix-init-reexport] Skipping: File not eligible for processing")
         sys.exit(0)
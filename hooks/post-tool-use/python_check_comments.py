@@ -15,6 +15,8 @@ from pathlib import Path
 from typing import Any, TypedDict, cast
 
 from comment_parser import comment_parser
+from hooklib.context import HookContext, read_hook_input, read_target_file
+from hooklib.contract import HookResult, invoke_hook
 
 RULES_DIR = Path(__file__).parent.parent.parent / "rules"
 
@@ -64,7 +66,7 @@ def main() -> None:
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
     try:
-        input_raw: str = sys.stdin.read()
+        input_raw: str = read_hook_input()
         if not input_raw:
             print(f"[{hook_filename}] Skipping: No input provided")
             sys.exit(0)
@@ -74,6 +76,17 @@ def main() -> None:
         print(f"[{hook_filename}] Skipping: Invalid input format")
         sys.exit(0)
 
+    handle_payload(data)
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    hook_filename = Path(__file__).stem.replace("_", "-")
+
     tool_name = data["tool_name"]
     tool_input = data["tool_input"]
 
@@ -164,8 +177,7 @@ def _process_edit_tool(tool_input: EditToolInput, file_path: str) -> list[tuple[
     start_line: int = 1
     if new_string and Path(file_path).exists():
         try:
-            with open(file_path, encoding="utf-8") as f:
-                current_content = f.read()
+            current_content = read_target_file(file_path) or ""
             index = current_content.find(new_string)
             if index != -1:
                 start_line = current_content[:index].count("\n") + 1
@@ -235,8 +247,7 @@ def _process_multiedit_tool(tool_input: MultiEditToolInput, file_path: str) -> l
 
     try:
         if Path(file_path).exists():
-            with open(file_path, encoding="utf-8") as f:
-                file_content = f.read()
+            file_content = read_target_file(file_path) or ""
         else:
             return []
     except Exception:
@@ -421,8 +432,7 @@ def extract_comments_from_file(file_path: str) -> list[Any]:
         return []
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            content: str = f.read()
+        content: str = read_target_file(file_path) or ""
         return extract_comments_from_string(content, file_path)
     except Exception:
         return []
@@ -498,8 +508,7 @@ def extract_docstrings_from_file(file_path: str) -> list[tuple[str, int, str]]:
         return []
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            content: str = f.read()
+        content: str = read_target_file(file_path) or ""
         return extract_docstrings_from_string(content, file_path)
     except Exception:
         return []
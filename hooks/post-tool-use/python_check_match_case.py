@@ -24,6 +24,9 @@ from typing import (
 )
 
 import ast_grep_py as sg
+from hooklib import pyproject
+from hooklib.context import HookContext, read_hook_input, read_target_file
+from hooklib.contract import HookResult, invoke_hook
 
 TYPE_IGNORE_PATTERN: Pattern[str] = re.compile(r"#\s*type:\s*ignore(?:\[[\w,\s]+\])?(?:\s|$)")
 
@@ -120,8 +123,17 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
+    _run_pipeline(parse_input())
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, _run_pipeline, context)
+
+
+def _run_pipeline(data: PostToolUseInput) -> None:
     try:
-        _execute_hook_pipeline()
+        _execute_hook_pipeline(data)
     except Exception:
         _handle_hook_error()
 
@@ -187,16 +199,12 @@ def _read_file_content(file_path: str) -> str | None:
     if not file_path or not Path(file_path).exists():
         return None
 
-    try:
-        with open(file_path, encoding="utf-8") as file_handle:
-            return file_handle.read()
-    except Exception:
-        return None
+    return read_target_file(file_path)
 
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw: str = sys.stdin.read()
+    input_raw: str = read_hook_input()
     if not input_raw:
         print("[check-match-case] Skipping: No input provided")
         sys.exit(0)
@@ -238,7 +246,7 @@ def should_process(data: PostToolUseInput) -> bool:
     if not file_path or not file_path.endswith(".py"):
         return False
 
-    if not _check_python_version_compatible():
+    if not _check_python_version_compatible(file_path):
         return False
 
     excluded: bool = _is_excluded_path(file_path)
@@ -301,9 +309,8 @@ def extract_file_path(data: PostToolUseInput) -> str:
     return ""
 
 
-def _execute_hook_pipeline() -> NoReturn:
+def _execute_hook_pipeline(data: PostToolUseInput) -> NoReturn:
     """Execute the main hook logic pipeline."""
-    data: PostToolUseInput = parse_input()
     if not should_process(data):
         print("[check-match-case] Skipping: File not eligible for processing")
         sys.exit(0)
@@ -334,30 +341,13 @@ def _is_excluded_path(file_path: str) -> bool:
     return False
 
 
-def _check_python_version_compatible() -> bool:
+def _check_python_version_compatible(file_path: str) -> bool:
     """Check if Python version is 3.10 or higher."""
     if sys.version_info.major == 3 and sys.version_info.minor >= 10:
         return True
 
-    pyproject_path = Path("pyproject.toml")
-    if pyproject_path.exists():
-        try:
-            with open(pyproject_path) as f:
-                content = f.read()
-
-            match = re.search(r'requires-python\s*=\s*"[^"]*3\.(\d+)', content)
-            if match:
-                minor = int(match.group(1))
-                return minor >= 10
-
-            match = re.search(r'target-version\s*=\s*"py3(\d+)"', content)
-            if match:
-                minor = int(match.group(1))
-                return minor >= 10
-        except Exception:
-            pass
-
-    return False
+    minimum_minor = pyproject.nearest(Path(file_path).parent).minimum_python_minor
+    return minimum_minor is not None and minimum_minor >= 10
 
 
 def _process_write_tool(tool_input: WriteToolInput) -> list[MatchCaseCandidate]:
@@ -662,8 +652,7 @@ def _get_existing_violations(file_path: str, tool_name: str, tool_input: ClaudeC
                 old_string = tool_input["old_string"]  # type: ignore[literal-required]
                 new_string = tool_input["new_string"]  # type: ignore[literal-required]
 
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+                current_content: str = read_target_file(file_path) or ""
 
                 if old_string and new_string and new_string in current_content:
                     pre_edit_content: str = current_content.replace(new_string, old_string, 1)
@@ -676,8 +665,7 @@ def _get_existing_violations(file_path: str, tool_name: str, tool_input: ClaudeC
     elif tool_name == "MultiEdit":
         if file_path and Path(file_path).exists():
             try:
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+                current_content: str = read_target_file(file_path) or ""
 
                 pre_edit_content: str = current_content
                 edits = tool_input["edits"]  # type: ignore[literal-required]
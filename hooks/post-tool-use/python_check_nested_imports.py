@@ -25,6 +25,8 @@ from typing import (
 )
 
 import ast_grep_py as sg
+from hooklib.context import HookContext, read_hook_input, read_target_file
+from hooklib.contract import HookResult, invoke_hook
 
 TYPE_IGNORE_PATTERN: Pattern[str] = re.compile(r"#\s*type:\s*ignore(?:\[[\w,\s]+\])?(?:\s|$)")
 
@@ -106,8 +108,17 @@ def run_nested_import_check() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
+    _run_pipeline(parse_input())
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, _run_pipeline, context)
+
+
+def _run_pipeline(data: PostToolUseInput) -> None:
     try:
-        _execute_hook_pipeline()
+        _execute_hook_pipeline(data)
     except Exception:
         _handle_hook_error()
 
@@ -164,11 +175,7 @@ def _read_file_content(file_path: str) -> str | None:
     if not file_path or not Path(file_path).exists():
         return None
 
-    try:
-        with open(file_path, encoding="utf-8") as file_handle:
-            return file_handle.read()
-    except Exception:
-        return None
+    return read_target_file(file_path)
 
 
 def adjust_line_numbers_for_edit(
@@ -181,8 +188,7 @@ def adjust_line_numbers_for_edit(
         return violations
 
     try:
-        with open(file_path, encoding="utf-8") as file_handle:
-            full_content: str = file_handle.read()
+        full_content: str = read_target_file(file_path) or ""
 
         old_string = tool_input["old_string"]  # type: ignore[literal-required]
         new_string = tool_input["new_string"]  # type: ignore[literal-required]
@@ -202,7 +208,7 @@ def adjust_line_numbers_for_edit(
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw: str = sys.stdin.read()
+    input_raw: str = read_hook_input()
     if not input_raw:
         print("[check-nested-imports] Skipping: No input provided")
         sys.exit(0)
@@ -304,9 +310,8 @@ def extract_file_path(data: PostToolUseInput) -> str:
     return ""
 
 
-def _execute_hook_pipeline() -> NoReturn:
+def _execute_hook_pipeline(data: PostToolUseInput) -> NoReturn:
     """Execute the main hook logic pipeline."""
-    data: PostToolUseInput = parse_input()
     if not should_process(data):
         print("[check-nested-imports] Skipping: File not eligible for processing")
         sys.exit(0)
@@ -552,8 +557,7 @@ def _get_existing_violations(
                 old_string = tool_input["old_string"]  # type: ignore[literal-required]
                 new_string = tool_input["new_string"]  # type: ignore[literal-required]
 
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+                current_content: str = read_target_file(file_path) or ""
 
                 if old_string and new_string and new_string in current_content:
                     pre_edit_content: str = current_content.replace(new_string, old_string, 1)
@@ -566,8 +570,7 @@ def _get_existing_violations(
     elif tool_name == "MultiEdit":
         if file_path and Path(file_path).exists():
             try:
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+                current_content: str = read_target_file(file_path) or ""
 
                 pre_edit_content: str = current_content
                 edits = tool_input["edits"]  # type: ignore[literal-required]
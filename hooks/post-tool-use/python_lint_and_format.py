@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["toml>=0.10.2"]
 # ///
 
 from __future__ import annotations
@@ -15,7 +14,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, NotRequired, TypedDict
 
-import toml
+from hooklib import pyproject
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 
 RULES_DIR = Path(__file__).parent.parent.parent / "rules"
 
@@ -64,7 +65,6 @@ VENV_RUFF_PATHS: list[Path] = [
     Path(".venv/bin/ruff"),
     Path("venv/bin/ruff"),
 ]
-PYPROJECT_PATH = Path("pyproject.toml")
 
 RUFF_CMD_CHECK = "check"
 RUFF_CMD_FORMAT = "format"
@@ -160,13 +160,27 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
-    input_data = sys.stdin.read()
-    file_path = get_target_file_path(input_data)
+    input_data = read_hook_input()
+    check_target_file(get_target_file_path(input_data))
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    """Handle an already parsed PostToolUse payload."""
+    check_target_file(extract_target_file_path(data))
+
+
+def check_target_file(file_path: str | None) -> None:
+    """Lint and format the target file with ruff, exiting with the hook status."""
     if not file_path:
         print("[ruff-hook] Skipping: No valid Python file path provided or file is not .py")
         sys.exit(0)
 
-    config = resolve_ruff_configuration()
+    config = resolve_ruff_configuration(file_path)
     if not config:
         print("[ruff-hook] Skipping: ruff not found in .venv or system PATH")
         sys.exit(0)
@@ -186,8 +200,17 @@ def get_target_file_path(input_data: str) -> str | None:
 
     try:
         data: PostToolUseInput = json.loads(input_data)
+    except json.JSONDecodeError:
+        return None
+
+    return extract_target_file_path(data)
+
+
+def extract_target_file_path(data: PostToolUseInput) -> str | None:
+    """Extract and validate the target file path from an already parsed payload."""
+    try:
         tool_input = data["tool_input"]
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (KeyError, TypeError):
         return None
 
     file_path = ""
@@ -201,8 +224,9 @@ def get_target_file_path(input_data: str) -> str | None:
     return file_path if _is_valid_python_file(file_path) else None
 
 
-def resolve_ruff_configuration() -> RuffConfiguration | None:
+def resolve_ruff_configuration(file_path: str) -> RuffConfiguration | None:
     """Resolve ruff executable path and configuration."""
+    project_config = pyproject.nearest(Path(file_path).parent)
     ruff_path, needs_fallback = find_ruff_executable()
     if not ruff_path:
         ruff_path = shutil.which("ruff")
@@ -210,9 +234,9 @@ def resolve_ruff_configuration() -> RuffConfiguration | None:
             return None
         needs_fallback = True
 
-    if needs_fallback or should_use_fallback_config():
-        lint_args, format_args = get_fallback_args()
-        print_fallback_mode_info()
+    if needs_fallback or should_use_fallback_config(project_config):
+        lint_args, format_args = get_fallback_args(project_config)
+        print_fallback_mode_info(project_config)
         use_fallback = True
     else:
         lint_args = [RUFF_FLAG_EXTEND_SELECT, ",".join(ALWAYS_ENFORCE_RULES)]
@@ -351,59 +375,43 @@ def find_ruff_executable() -> tuple[str | None, bool]:
     return None, True
 
 
-def should_use_fallback_config() -> bool:
+def should_use_fallback_config(project_config: pyproject.Pyproject) -> bool:
     """Check if fallback configuration should be used.
 
     Returns:
         True if fallback config should be used (no config file or no ruff config)
     """
-    if not PYPROJECT_PATH.exists():
+    ruff_config = project_config.ruff
+    if ruff_config is None:
         return True
 
-    try:
-        with open(PYPROJECT_PATH) as f:
-            config: PyprojectConfig = toml.load(f)
-
-        has_ruff_config = "tool" in config and "ruff" in config["tool"]
-        if not has_ruff_config:
-            return True
+    lint_config = ruff_config.get("lint")
+    has_lint_select = isinstance(lint_config, dict) and "select" in lint_config
+    has_line_length = "line-length" in ruff_config
 
-        ruff_config = config["tool"]["ruff"]
-        has_lint_select = "lint" in ruff_config and "select" in ruff_config["lint"]
-        has_line_length = "line-length" in ruff_config
-
-        return not (has_lint_select or has_line_length)
-    except (OSError, toml.TomlDecodeError, KeyError, TypeError):
-        return True
+    return not (has_lint_select or has_line_length)
 
 
-def get_python_version() -> str:
+def get_python_version(project_config: pyproject.Pyproject) -> str:
     """Get target Python version from pyproject.toml or current environment.
 
     Returns:
         Python version string (e.g., 'py311')
     """
-    if not PYPROJECT_PATH.exists():
-        return _get_current_python_version()
-
-    try:
-        with open(PYPROJECT_PATH) as f:
-            config: PyprojectConfig = toml.load(f)
+    config: PyprojectConfig = project_config.data
 
-        target_version = _get_ruff_target_version(config)
-        if target_version:
-            return target_version
+    target_version = _get_ruff_target_version(config)
+    if target_version:
+        return target_version
 
-        project_version = _get_project_python_version(config)
-        if project_version:
-            return project_version
+    project_version = _get_project_python_version(config)
+    if project_version:
+        return project_version
 
-        return _get_current_python_version()
-    except (OSError, toml.TomlDecodeError, KeyError, TypeError):
-        return _get_current_python_version()
+    return _get_current_python_version()
 
 
-def get_fallback_args() -> tuple[list[str], list[str]]:
+def get_fallback_args(project_config: pyproject.Pyproject) -> tuple[list[str], list[str]]:
     """Get fallback ruff arguments for lint and format.
 
     Returns:
@@ -425,16 +433,16 @@ def get_fallback_args() -> tuple[list[str], list[str]]:
         str(FALLBACK_LINE_LENGTH),
     ]
 
-    python_version = get_python_version()
+    python_version = get_python_version(project_config)
     lint_args.extend([RUFF_FLAG_TARGET_VERSION, python_version])
     format_args.extend([RUFF_FLAG_TARGET_VERSION, python_version])
 
     return lint_args, format_args
 
 
-def print_fallback_mode_info() -> None:
+def print_fallback_mode_info(project_config: pyproject.Pyproject) -> None:
     """Print information about the fallback mode configuration."""
-    python_version = get_python_version()
+    python_version = get_python_version(project_config)
 
     info_lines = [
         "\n<ruff-fallback-mode>",
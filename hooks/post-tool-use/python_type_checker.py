@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["toml>=0.10.2"]
 # ///
 
 from __future__ import annotations
@@ -17,7 +16,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, NotRequired, TypedDict
 
-import toml
+from hooklib import project, pyproject
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
 
 # Configuration constants
 DEFAULT_TIMEOUT_MS = 60000
@@ -54,7 +55,6 @@ DEFAULT_EXCLUDE_PATTERNS = [
     "**/*.egg-info",
 ]
 
-PYPROJECT_PATH = Path("pyproject.toml")
 BASEDPYRIGHT_CONFIG_NAMES = [
     "basedpyrightconfig.json",
     "pyrightconfig.json",
@@ -138,8 +138,22 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
-    input_data = sys.stdin.read()
-    file_path = get_target_file_path(input_data)
+    input_data = read_hook_input()
+    check_target_file(get_target_file_path(input_data))
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    """Handle an already parsed PostToolUse payload."""
+    check_target_file(extract_target_file_path(data))
+
+
+def check_target_file(file_path: str | None) -> None:
+    """Type check the target file with basedpyright, exiting with the hook status."""
     if not file_path:
         print("[typecheck-hook] Skipping: No valid Python file path provided or file is not .py/.pyi")
         sys.exit(0)
@@ -169,8 +183,17 @@ def get_target_file_path(input_data: str) -> str | None:
 
     try:
         data: PostToolUseInput = json.loads(input_data)
+    except json.JSONDecodeError:
+        return None
+
+    return extract_target_file_path(data)
+
+
+def extract_target_file_path(data: PostToolUseInput) -> str | None:
+    """Extract and validate the target file path from an already parsed payload."""
+    try:
         tool_input = data["tool_input"]
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (KeyError, TypeError):
         return None
 
     file_path = ""
@@ -275,19 +298,9 @@ def should_use_fallback_config(project_root: Path) -> bool:
     Returns:
         True if fallback config should be used (no config file or no basedpyright config)
     """
-    pyproject_path = project_root / "pyproject.toml"
-    if pyproject_path.exists():
-        try:
-            with open(pyproject_path) as f:
-                config: PyprojectConfig = toml.load(f)
-
-            has_basedpyright_config = "tool" in config and (
-                "basedpyright" in config["tool"] or "pyright" in config["tool"]
-            )
-            if has_basedpyright_config:
-                return False
-        except (OSError, toml.TomlDecodeError, KeyError, TypeError):
-            pass
+    project_config = pyproject.for_project(project_root)
+    if project_config.basedpyright is not None or project_config.pyright is not None:
+        return False
 
     for config_name in BASEDPYRIGHT_CONFIG_NAMES:
         config_path = project_root / config_name
@@ -379,28 +392,14 @@ def run_basedpyright_command(basedpyright_path: str, args: list[str]) -> tuple[s
 
 def find_project_root(file_path: Path) -> Path:
     """Find project root by looking for pyproject.toml or .git."""
-    current = file_path.parent
-
-    while current != current.parent:
-        if (current / "pyproject.toml").exists() or (current / ".git").exists():
-            return current
-        current = current.parent
-
-    return file_path.parent
+    return project.resolve(file_path.parent).nearest("pyproject.toml", ".git") or file_path.parent
 
 
 def find_config_file(project_root: Path) -> Path | None:
     """Find basedpyright or pyright config file."""
-    pyproject_path = project_root / "pyproject.toml"
-    if pyproject_path.exists():
-        try:
-            with open(pyproject_path, encoding="utf-8") as f:
-                data = toml.loads(f.read())
-
-            if "tool" in data and ("basedpyright" in data["tool"] or "pyright" in data["tool"]):
-                return pyproject_path
-        except Exception:
-            pass
+    project_config = pyproject.for_project(project_root)
+    if project_config.basedpyright is not None or project_config.pyright is not None:
+        return project_config.path
 
     for config_name in BASEDPYRIGHT_CONFIG_NAMES:
         config_path = project_root / config_name
@@ -412,16 +411,8 @@ def find_config_file(project_root: Path) -> Path | None:
 
 def has_mypy_config(project_root: Path) -> bool:
     """Check if project has mypy configuration."""
-    pyproject_path = project_root / "pyproject.toml"
-    if pyproject_path.exists():
-        try:
-            with open(pyproject_path, encoding="utf-8") as f:
-                data = toml.loads(f.read())
-
-            if "tool" in data and "mypy" in data["tool"]:
-                return True
-        except Exception:
-            pass
+    if pyproject.for_project(project_root).mypy is not None:
+        return True
 
     mypy_ini = project_root / "mypy.ini"
     if mypy_ini.exists():
@@ -442,29 +433,21 @@ def has_mypy_config(project_root: Path) -> bool:
 
 def get_python_version(project_root: Path) -> str:
     """Get target Python version from pyproject.toml or current environment."""
-    pyproject_path = project_root / "pyproject.toml"
-    if not pyproject_path.exists():
-        return _get_current_python_version()
+    config: PyprojectConfig = pyproject.for_project(project_root).data
 
-    try:
-        with open(pyproject_path, encoding="utf-8") as f:
-            config = toml.loads(f.read())
+    target_version = _get_basedpyright_target_version(config)
+    if target_version:
+        return target_version
 
-        target_version = _get_basedpyright_target_version(config)
-        if target_version:
-            return target_version
+    target_version = _get_pyright_target_version(config)
+    if target_version:
+        return target_version
 
-        target_version = _get_pyright_target_version(config)
-        if target_version:
-            return target_version
+    project_version = _get_project_python_version(config)
+    if project_version:
+        return project_version
 
-        project_version = _get_project_python_version(config)
-        if project_version:
-            return project_version
-
-        return _get_current_python_version()
-    except (OSError, KeyError, TypeError):
-        return _get_current_python_version()
+    return _get_current_python_version()
 
 
 def _wrap_in_xml_tags(tag: str, content: str) -> str:
@@ -605,40 +588,18 @@ def get_exclude_patterns(project_root: Path) -> list[str]:
     """
     exclude_patterns = []
 
-    # Try to load from pyproject.toml
-    pyproject_path = project_root / "pyproject.toml"
-    if pyproject_path.exists():
-        try:
-            with open(pyproject_path, encoding="utf-8") as f:
-                config = toml.load(f)
-
-            # Check for basedpyright exclude patterns
-            if "tool" in config:
-                if "basedpyright" in config["tool"]:
-                    basedpyright_config = config["tool"]["basedpyright"]
-                    if "exclude" in basedpyright_config:
-                        exclude = basedpyright_config["exclude"]
-                        if isinstance(exclude, list):
-                            exclude_patterns.extend(exclude)
-                        elif isinstance(exclude, str):
-                            exclude_patterns.append(exclude)
-                    # Return early if basedpyright config exists with exclude
-                    return exclude_patterns if exclude_patterns else DEFAULT_EXCLUDE_PATTERNS
-
-                # Check for pyright exclude patterns if basedpyright not found
-                if "pyright" in config["tool"]:
-                    pyright_config = config["tool"]["pyright"]
-                    if "exclude" in pyright_config:
-                        exclude = pyright_config["exclude"]
-                        if isinstance(exclude, list):
-                            exclude_patterns.extend(exclude)
-                        elif isinstance(exclude, str):
-                            exclude_patterns.append(exclude)
-                    # Return early if pyright config exists
-                    return exclude_patterns if exclude_patterns else DEFAULT_EXCLUDE_PATTERNS
-
-        except (OSError, toml.TomlDecodeError, KeyError, TypeError):
-            pass
+    # Try to load from pyproject.toml; basedpyright settings take precedence over pyright's
+    project_config = pyproject.for_project(project_root)
+    checker_config = project_config.basedpyright
+    if checker_config is None:
+        checker_config = project_config.pyright
+    if checker_config is not None:
+        exclude = checker_config.get("exclude")
+        if isinstance(exclude, list):
+            exclude_patterns.extend(exclude)
+        elif isinstance(exclude, str):
+            exclude_patterns.append(exclude)
+        return exclude_patterns if exclude_patterns else DEFAULT_EXCLUDE_PATTERNS
 
     # Try to load from basedpyright/pyright config files
     for config_name in BASEDPYRIGHT_CONFIG_NAMES:
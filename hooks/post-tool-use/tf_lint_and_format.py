@@ -14,6 +14,9 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import TypedDict
 
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
+
 # Configuration constants
 TERRAFORM_EXTENSIONS: list[str] = [".tf", ".tfvars"]
 TF_BINARY = "terraform"
@@ -94,8 +97,22 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
-    input_data = sys.stdin.read()
-    file_path = get_target_file_path(input_data)
+    input_data = read_hook_input()
+    check_target_file(get_target_file_path(input_data))
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    """Handle an already parsed PostToolUse payload."""
+    check_target_file(extract_target_file_path(data))
+
+
+def check_target_file(file_path: str | None) -> None:
+    """Format and validate the target file with terraform, exiting with the hook status."""
     if not file_path:
         print("[terraform-hook] Skipping: No valid Terraform file path provided or file is not .tf/.tfvars")
         sys.exit(0)
@@ -120,6 +137,15 @@ def get_target_file_path(input_data: str) -> str | None:
 
     try:
         input_json = json.loads(input_data)
+    except json.JSONDecodeError:
+        return None
+
+    return extract_target_file_path(input_json)
+
+
+def extract_target_file_path(input_json: PostToolUseInput) -> str | None:
+    """Extract and validate the target Terraform file path from an already parsed payload."""
+    try:
         data = PostToolUseInput(
             session_id=input_json["session_id"],
             tool_name=input_json["tool_name"],
@@ -130,7 +156,7 @@ def get_target_file_path(input_data: str) -> str | None:
             tool_response=input_json["tool_response"],
         )
         tool_input = data["tool_input"]
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (KeyError, TypeError):
         return None
 
     file_path = ""
@@ -11,6 +11,9 @@ import sys
 from pathlib import Path
 from typing import Any, TypedDict
 
+from hooklib.context import HookContext, read_hook_input, read_target_file
+from hooklib.contract import HookResult, invoke_hook
+
 RULES_DIR = Path(__file__).parent.parent.parent / "rules"
 
 
@@ -66,14 +69,28 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
-    input_data = sys.stdin.read()
+    input_data = read_hook_input()
     if not input_data:
         sys.exit(0)
 
     try:
         data: PostToolUseInput = json.loads(input_data)
+    except json.JSONDecodeError:
+        sys.exit(0)
+
+    handle_payload(data)
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    """Check an already parsed PostToolUse payload for `any` usage."""
+    try:
         tool_input = data["tool_input"]
-    except (json.JSONDecodeError, KeyError):
+    except KeyError:
         sys.exit(0)
 
     file_path = ""
@@ -84,12 +101,11 @@ def main() -> None:
         print(f"[typescript-any-check] Skipping: Not a TypeScript file: {file_path}")
         sys.exit(0)
 
-    path = Path(file_path)
-    if not path.exists():
+    content = read_target_file(file_path)
+    if content is None:
         print(f"[typescript-any-check] Skipping: File does not exist: {file_path}")
         sys.exit(0)
 
-    content = path.read_text()
     issues = check_any_usage(content, file_path)
 
     if not issues:
@@ -13,6 +13,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, TypedDict
 
+from hooklib import project
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
+
 RULES_DIR = Path(__file__).parent.parent.parent / "rules"
 
 
@@ -82,8 +86,22 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
-    input_data = sys.stdin.read()
-    file_path = get_target_file_path(input_data)
+    input_data = read_hook_input()
+    check_target_file(get_target_file_path(input_data))
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, handle_payload, context)
+
+
+def handle_payload(data: PostToolUseInput) -> None:
+    """Handle an already parsed PostToolUse payload."""
+    check_target_file(extract_target_file_path(data))
+
+
+def check_target_file(file_path: str | None) -> None:
+    """Type check the target file with tsc, exiting with the hook status."""
     if not file_path:
         print("[tsc-hook] Skipping: No valid TypeScript file path provided")
         sys.exit(0)
@@ -108,8 +126,17 @@ def get_target_file_path(input_data: str) -> str | None:
 
     try:
         data: PostToolUseInput = json.loads(input_data)
+    except json.JSONDecodeError:
+        return None
+
+    return extract_target_file_path(data)
+
+
+def extract_target_file_path(data: PostToolUseInput) -> str | None:
+    """Extract and validate the target file path from an already parsed payload."""
+    try:
         tool_input = data["tool_input"]
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (KeyError, TypeError):
         return None
 
     file_path = ""
@@ -212,13 +239,9 @@ def find_tsconfig(file_path: str) -> Path | None:
     Returns:
         Path to tsconfig.json if found, None otherwise
     """
-    current_dir = Path(file_path).parent.absolute()
-
-    while current_dir != current_dir.parent:
-        tsconfig = current_dir / "tsconfig.json"
-        if tsconfig.exists():
-            return tsconfig
-        current_dir = current_dir.parent
+    tsconfig = project.resolve(Path(file_path).parent).tsconfig
+    if tsconfig:
+        return tsconfig
 
     tsconfig = Path("tsconfig.json")
     if tsconfig.exists():
@@ -16,6 +16,9 @@ import traceback
 from pathlib import Path
 from typing import Any, NoReturn, TypedDict
 
+from hooklib.context import HookContext, read_hook_input
+from hooklib.contract import HookResult, invoke_hook
+
 
 class Config:
     """Configuration constants for the hook."""
@@ -56,15 +59,23 @@ def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
+    _run_pipeline(parse_input())
+
+
+def run(context: HookContext) -> HookResult:
+    """In-process entry point used by the PostToolUse dispatcher."""
+    return invoke_hook(__file__, _run_pipeline, context)
+
+
+def _run_pipeline(data: PostToolUseInput) -> None:
     try:
-        _execute_hook_pipeline()
+        _execute_hook_pipeline(data)
     except Exception as e:
         _handle_hook_error(e)
 
 
-def _execute_hook_pipeline() -> NoReturn:
+def _execute_hook_pipeline(data: PostToolUseInput) -> NoReturn:
     """Execute the main hook logic pipeline."""
-    data = parse_input()
     if not should_process(data):
         sys.exit(Config.EXIT_CODE_SUCCESS)
 
@@ -86,7 +97,7 @@ def _execute_hook_pipeline() -> NoReturn:
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw = sys.stdin.read()
+    input_raw = read_hook_input()
     if not input_raw.strip():
         sys.exit(Config.EXIT_CODE_SUCCESS)
 
@@ -5,14 +5,44 @@ PostToolUse hook executor that reads settings.json and executes matching hooks.
 Usage:
     echo '{"tool_name": "Write", "tool_input": {...}}' | python post_tool_use.py
     python post_tool_use.py --tool Write < input.json
+    python post_tool_use.py --daemon
+    python post_tool_use.py --warmup
+    python post_tool_use.py --stats [--window 24h]
+
+--warmup resolves every hook's PEP 723 dependencies into one shared environment;
+once it exists the dispatcher re-executes itself with that interpreter and runs
+hook scripts with it directly instead of through `uv run`.
+
+When a daemon started with --daemon is listening, invocations are forwarded to it
+over a Unix socket. Otherwise Python hooks that import cleanly are called in-process
+through their `run(payload)` entry point, and everything else is spawned as a shell
+command.
 """
 
+import argparse
 import asyncio
+import contextlib
+import functools
 import json
 import os
 import re
+import shlex
+import signal
 import sys
+import tempfile
+import time
 from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from typing import Any
+
+from dispatcher import daemon, inprocess, resultcache, routing, sharedenv, telemetry
+from hooklib.context import PAYLOAD_FILE_ENV, HookContext
+
+HOOK_TIMEOUT_SECONDS = 30.0
+# Total time budget for one dispatcher invocation; only CRITICAL hooks may outlive it
+DISPATCH_BUDGET_SECONDS = float(os.environ.get("POST_TOOL_USE_BUDGET_SECONDS", "45"))
+BUDGET_EXHAUSTED_MESSAGE = "Hook cancelled: dispatch time budget exhausted"
 
 TODOLIST_CHECK_CMD = (
     "input=$(cat); "
@@ -22,107 +52,188 @@ TODOLIST_CHECK_CMD = (
 )
 
 
+class HookPriority(IntEnum):
+    """Start order within a stage; everything below CRITICAL is bound by the dispatch budget."""
+
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
 @dataclass
 class HookCommand:
     type: str
     command: str
     asyncable: bool = False
+    mutates_file: bool = False
+    # Diffs the file against tool_input's new_string, so it must run before mutators reformat it
+    diffs_edit: bool = False
+    # Starts long-running tools (ruff, basedpyright, tsc), so it always runs as a subprocess
+    # whose process group can be killed when the budget runs out or the hook is cancelled
+    spawns_tools: bool = False
+    priority: HookPriority = HookPriority.NORMAL
+    # A block (exit 2) from this hook is final enough to cancel the rest under fail_fast
+    authoritative: bool = False
+    # Result is a pure function of hook source, rules, file content and the edit
+    cacheable: bool = False
+    # Routing: rules/<language>.json supplies extensions and exclusions; explicit
+    # extensions replace the language's, path globs and exclusions narrow further
+    language: str | None = None
+    extensions: tuple[str, ...] = ()
+    path_globs: tuple[str, ...] = ()
+    excluded_paths: tuple[str, ...] = ()
+
+    def applies_to(self, file_path: str) -> bool:
+        return routing.is_applicable(
+            file_path,
+            language=self.language,
+            extensions=self.extensions,
+            path_globs=self.path_globs,
+            excluded_paths=self.excluded_paths,
+        )
 
 
 @dataclass
 class HookMatcher:
     matcher: str
     hooks: list[HookCommand]
+    # Stop waiting for same- or lower-priority hooks once an authoritative hook blocks
+    fail_fast: bool = False
 
 
 POST_TOOL_USE_CONFIG: list[HookMatcher] = [
     HookMatcher(
         matcher="Write|Edit|MultiEdit",
+        fail_fast=True,
         hooks=[
             HookCommand(
                 type="command",
                 command="~/.claude/hooks/post-tool-use/system-reminder.sh",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/inject_conftest.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/inject_knowledge.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/inject_language_guide.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/typescript_typecheck.py",
                 asyncable=True,
+                spawns_tools=True,
+                priority=HookPriority.LOW,
+                language="typescript",
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/typescript_check_any_usage.py",
                 asyncable=True,
+                language="typescript",
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_auto_fix_init_reexport.py",
                 asyncable=False,
+                mutates_file=True,
+                priority=HookPriority.CRITICAL,
+                language="python",
+                path_globs=("*__init__.py",),
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_lint_and_format.py",
                 asyncable=False,
+                mutates_file=True,
+                spawns_tools=True,
+                priority=HookPriority.CRITICAL,
+                extensions=(".py",),
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_type_checker.py",
                 asyncable=False,
+                spawns_tools=True,
+                priority=HookPriority.LOW,
+                extensions=(".py", ".pyi"),
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_check_any_return.py",
                 asyncable=True,
+                diffs_edit=True,
+                authoritative=True,
+                cacheable=True,
+                language="python",
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/check_typeddict_total_false.py",
                 asyncable=True,
+                diffs_edit=True,
+                authoritative=True,
+                cacheable=True,
+                extensions=(".py",),
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_check_comments.py",
                 asyncable=True,
+                diffs_edit=True,
+                cacheable=True,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_check_nested_imports.py",
                 asyncable=True,
+                diffs_edit=True,
+                authoritative=True,
+                cacheable=True,
+                extensions=(".py",),
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/python_check_match_case.py",
                 asyncable=True,
+                diffs_edit=True,
+                authoritative=True,
+                cacheable=True,
+                language="python",
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/check_corrupted_encoding.py",
                 asyncable=True,
+                authoritative=True,
+                cacheable=True,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/validate_ai_todolist_json.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
+                path_globs=("*ai-todolist.json",),
             ),
             HookCommand(
                 type="command",
                 command=TODOLIST_CHECK_CMD,
                 asyncable=False,
+                priority=HookPriority.HIGH,
+                path_globs=("*ai-todolist.json",),
             ),
         ],
     ),
@@ -133,16 +244,19 @@ POST_TOOL_USE_CONFIG: list[HookMatcher] = [
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/inject_knowledge.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/inject_language_guide.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
             HookCommand(
                 type="command",
                 command="uv run ~/.claude/hooks/post-tool-use/inject_conftest.py",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             ),
         ],
     ),
@@ -153,6 +267,7 @@ POST_TOOL_USE_CONFIG: list[HookMatcher] = [
                 type="command",
                 command="~/.claude/hooks/post-tool-use/remind-execution.sh",
                 asyncable=False,
+                priority=HookPriority.HIGH,
             )
         ],
     ),
@@ -168,22 +283,103 @@ def is_self_hook(command: str) -> bool:
     return "post_tool_use.py" in command
 
 
-async def execute_hook_async(command: str, stdin_data: str, cwd: str) -> tuple[int, str, str]:
+def hook_script_path(command: str) -> Path | None:
+    match command.split():
+        case ["uv", "run", script] if script.endswith(".py"):
+            return Path(script).expanduser().resolve()
+        case _:
+            return None
+
+
+def python_hook_scripts() -> list[Path]:
+    scripts: list[Path] = []
+    for config in POST_TOOL_USE_CONFIG:
+        for hook in config.hooks:
+            script = hook_script_path(hook.command)
+            if script and script not in scripts and not is_self_hook(hook.command):
+                scripts.append(script)
+    return scripts
+
+
+@functools.cache
+def shared_hook_interpreter() -> Path | None:
+    return sharedenv.shared_interpreter(python_hook_scripts())
+
+
+def direct_hook_command(command: str) -> str:
+    """Swap `uv run <hook>.py` for the warmed-up interpreter when it is available."""
+    script = hook_script_path(command)
+    python = shared_hook_interpreter()
+    if script is None or python is None:
+        return command
+    return f"{shlex.quote(str(python))} {shlex.quote(str(script))}"
+
+
+def build_hook_stages(hooks: list[HookCommand]) -> list[list[HookCommand]]:
+    """Order hooks into stages that run one after another.
+
+    Hooks that find new violations by locating the edit's new_string in the file
+    run first, concurrently, on the file exactly as the edit left it; once ruff has
+    reformatted it, new_string no longer appears verbatim and every existing
+    violation would look new. Hooks that rewrite the edited file then each get their
+    own stage, in config order. Every other hook only reads the result, so they all
+    share the final stage and run concurrently on the final content. Hooks within a
+    stage start in priority order.
+    """
+    by_priority = functools.partial(sorted, key=lambda hook: hook.priority)
+    edit_readers = by_priority(hook for hook in hooks if hook.diffs_edit and not hook.mutates_file)
+    readers = by_priority(hook for hook in hooks if not hook.diffs_edit and not hook.mutates_file)
+    stages = [[hook] for hook in hooks if hook.mutates_file]
+    if edit_readers:
+        stages.insert(0, edit_readers)
+    if readers:
+        stages.append(readers)
+    return stages
+
+
+async def execute_hook_async(
+    command: str,
+    stdin_data: str,
+    cwd: str,
+    base_env: dict[str, str] | None = None,
+    payload_path: str | None = None,
+) -> tuple[int, str, str]:
     try:
-        env = os.environ.copy()
+        env = dict(base_env) if base_env is not None else os.environ.copy()
         env["POST_TOOL_USE_RUNNING"] = "1"
         env["CLAUDE_CODE_CWD"] = cwd
 
-        process = await asyncio.create_subprocess_shell(
-            command,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            env=env,
-            cwd=cwd,
+        # Python hooks read the shared payload file; shell hooks still get it on stdin
+        if payload_path and hook_script_path(command) is not None:
+            env[PAYLOAD_FILE_ENV] = payload_path
+            stdin_data = ""
+
+        spawn = asyncio.ensure_future(
+            asyncio.create_subprocess_shell(
+                direct_hook_command(command),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+                cwd=cwd,
+                start_new_session=True,
+            )
         )
+        try:
+            process = await asyncio.shield(spawn)
+        except asyncio.CancelledError:
+            # Cancelled while starting: the hook may already be running, and nothing else would kill it
+            with contextlib.suppress(Exception):
+                kill_process_group((await spawn).pid)
+            raise
 
-        stdout_bytes, stderr_bytes = await asyncio.wait_for(process.communicate(stdin_data.encode()), timeout=30.0)
+        try:
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                process.communicate(stdin_data.encode()), timeout=HOOK_TIMEOUT_SECONDS
+            )
+        except (TimeoutError, asyncio.CancelledError):
+            kill_process_group(process.pid)
+            raise
 
         return (
             process.returncode or 0,
@@ -196,81 +392,278 @@ async def execute_hook_async(command: str, stdin_data: str, cwd: str) -> tuple[i
         return 1, "", f"Hook execution failed: {e}"
 
 
-async def _main() -> int:
-    if os.environ.get("POST_TOOL_USE_RUNNING"):
-        return 0
+def kill_process_group(pid: int) -> None:
+    """Kill a hook and everything it started (ruff, basedpyright, tsc, ...)."""
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pid, signal.SIGKILL)
 
-    tool_name: str | None = None
-    if len(sys.argv) > 1 and sys.argv[1] == "--tool" and len(sys.argv) > 2:
-        tool_name = sys.argv[2]
 
-    stdin_data = sys.stdin.read()
+async def execute_hook(
+    command: str, stdin_data: str, context: HookContext | None, cwd: str, in_process: bool = True
+) -> tuple[int, str, str]:
+    """Call a Python hook in-process on a thread, or spawn it when that is not possible or wanted.
+
+    A hook thread cannot be killed, so hooks that start tools of their own pass
+    in_process=False and run in a process group that timeouts and cancellation kill.
+    A thread left running by the budget is a daemon thread and ends with this
+    process; the daemon recycles its pool worker instead.
+    """
+    payload_path = context.payload_path if context is not None else None
+    script = hook_script_path(command)
+    module = inprocess.load_hook(script) if in_process and script is not None and context is not None else None
+    if module is None or context is None:
+        return await execute_hook_async(command, stdin_data, cwd, payload_path=payload_path)
 
+    try:
+        inprocess.enter_hook_environment(cwd)
+    except OSError:
+        return await execute_hook_async(command, stdin_data, cwd, payload_path=payload_path)
+
+    return await inprocess.run_hook_in_thread(module, context, HOOK_TIMEOUT_SECONDS)
+
+
+async def dispatch(
+    stdin_data: str, tool_name: str | None, execute: daemon.HookExecutor = execute_hook
+) -> tuple[int, str]:
+    """Run every hook matching the tool and collect what Claude needs to see.
+
+    Returns:
+        Tuple of (exit_code, stderr)
+    """
     # Extract actual Claude Code cwd from stdin JSON
     current_cwd = os.getcwd()  # fallback
+    payload: dict[str, Any] | None = None
     if stdin_data:
         try:
             input_json = json.loads(stdin_data)
-            current_cwd = input_json.get("cwd", os.getcwd())
-            if not tool_name:
-                tool_name = input_json.get("tool_name")
         except json.JSONDecodeError:
-            pass
+            input_json = None
+        if isinstance(input_json, dict):
+            payload = input_json
+            current_cwd = payload.get("cwd", os.getcwd())
+            if not tool_name:
+                tool_name = payload.get("tool_name")
 
     if not tool_name:
-        print("Error: tool_name not provided", file=sys.stderr)
-        return 1
+        return 1, "Error: tool_name not provided\n"
 
     matching_hooks: list[HookCommand] = []
+    fail_fast = False
     for config in POST_TOOL_USE_CONFIG:
         if match_tool(tool_name, config.matcher):
             matching_hooks.extend(config.hooks)
+            fail_fast = fail_fast or config.fail_fast
 
     if not matching_hooks:
-        print(f"No hooks found for tool: {tool_name}", file=sys.stderr)
-        return 0
+        return 0, f"No hooks found for tool: {tool_name}\n"
 
+    target_path = HookContext.from_payload(payload).file_path if payload is not None else ""
     valid_hooks = [
-        hook for hook in matching_hooks if hook.type == "command" and hook.command and not is_self_hook(hook.command)
+        hook
+        for hook in matching_hooks
+        if hook.type == "command"
+        and hook.command
+        and not is_self_hook(hook.command)
+        and hook.applies_to(target_path)
     ]
 
     if not valid_hooks:
-        return 0
+        return 0, ""
+
+    samples: list[telemetry.HookSample] = []
+    skipped: list[HookCommand] = []
+    cancelled: list[HookCommand] = []
+    blocker: HookCommand | None = None
+    deadline = time.monotonic() + DISPATCH_BUDGET_SECONDS
+
+    async def execute_timed(hook: HookCommand, context: HookContext | None) -> tuple[int, str, str] | None:
+        remaining = deadline - time.monotonic()
+        if hook.priority is not HookPriority.CRITICAL and remaining <= 0:
+            skipped.append(hook)
+            return None
+
+        started = time.perf_counter()
+        cache_key = None
+        script = hook_script_path(hook.command)
+        if hook.cacheable and script is not None and context is not None:
+            cache_key = resultcache.cache_key(hook.command, script, context)
+            cached = resultcache.lookup(cache_key) if cache_key is not None else None
+            if cached is not None:
+                wall_ms = (time.perf_counter() - started) * 1000
+                samples.append(telemetry.sample(hook.command, tool_name, target_path, wall_ms, cached, cached=True))
+                return cached
+
+        over_budget = False
+        try:
+            if hook.priority is HookPriority.CRITICAL:
+                outcome = await execute(hook.command, stdin_data, context, current_cwd, not hook.spawns_tools)
+            else:
+                outcome = await asyncio.wait_for(
+                    execute(hook.command, stdin_data, context, current_cwd, not hook.spawns_tools), remaining
+                )
+        except TimeoutError:
+            skipped.append(hook)
+            over_budget = True
+            outcome = (1, "", BUDGET_EXHAUSTED_MESSAGE)
+
+        wall_ms = (time.perf_counter() - started) * 1000
+        samples.append(telemetry.sample(hook.command, tool_name, target_path, wall_ms, outcome, over_budget))
+        if over_budget:
+            return None
+
+        # Only definite verdicts are replayable; errors and timeouts should run again
+        if cache_key is not None and outcome[0] in (0, 2) and outcome[2] != telemetry.TIMEOUT_MESSAGE:
+            resultcache.store(cache_key, outcome)
+        return outcome
+
+    async def execute_tagged(
+        hook: HookCommand, context: HookContext | None
+    ) -> tuple[HookCommand, tuple[int, str, str] | None]:
+        return hook, await execute_timed(hook, context)
+
+    def outranks_blocker(hook: HookCommand) -> bool:
+        return blocker is None or hook.priority is HookPriority.CRITICAL or hook.priority < blocker.priority
 
     async_hooks = [hook for hook in valid_hooks if hook.asyncable]
     sync_hooks = [hook for hook in valid_hooks if not hook.asyncable]
-    claude_needs_to_know = False
-
-    if async_hooks:
-        tasks = [execute_hook_async(hook.command, stdin_data, current_cwd) for hook in async_hooks]
-        results: list[tuple[int, str, str] | BaseException] = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for hook, result in zip(async_hooks, results, strict=False):
-            if isinstance(result, BaseException):
+    # Outcomes are keyed by id() because identical HookCommand entries compare equal
+    outcomes: dict[int, tuple[int, str, str]] = {}
+
+    # One payload file shared by every hook that still runs as a subprocess
+    with tempfile.NamedTemporaryFile("w", prefix="post-tool-use-", suffix=".json", encoding="utf-8") as payload_file:
+        payload_file.write(stdin_data)
+        payload_file.flush()
+
+        for stage in build_hook_stages(valid_hooks):
+            runnable = [hook for hook in stage if outranks_blocker(hook)]
+            cancelled.extend(hook for hook in stage if not outranks_blocker(hook))
+            if not runnable:
                 continue
 
-            returncode, _stdout, stderr = result
-            if returncode == 2 and stderr:
-                claude_needs_to_know = True
-                print(stderr, file=sys.stderr, end="")
+            # A fresh context per stage, so each stage sees the file as the previous one left it
+            context = HookContext.from_payload(payload, payload_file.name) if payload is not None else None
+            tasks = {asyncio.ensure_future(execute_tagged(hook, context)): hook for hook in runnable}
+
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    hook, result = await next_done
+                except asyncio.CancelledError:
+                    # Our own fail-fast cancellation; anything else cancelling dispatch propagates
+                    current = asyncio.current_task()
+                    if current is not None and current.cancelling():
+                        raise
+                    continue
+                except Exception:
+                    continue
+                if result is None:
+                    continue
+                outcomes[id(hook)] = result
+
+                # The agent is about to rewrite the file, so checks that rank no higher are wasted
+                if fail_fast and blocker is None and hook.authoritative and result[0] == 2 and result[2]:
+                    blocker = hook
+                    for task, other in tasks.items():
+                        if not task.done() and not outranks_blocker(other):
+                            task.cancel()
+                            cancelled.append(other)
+
+    telemetry.record(samples)
 
-    for hook in sync_hooks:
-        returncode, _stdout, stderr = await execute_hook_async(hook.command, stdin_data, current_cwd)
+    claude_needs_to_know = False
+    report: list[str] = []
+
+    for hook in [*async_hooks, *sync_hooks]:
+        if id(hook) not in outcomes:
+            continue
 
+        returncode, _stdout, stderr = outcomes[id(hook)]
         if returncode == 2 and stderr:
             claude_needs_to_know = True
-            print(f"Hook Executed: {hook.command}", file=sys.stderr)
-            print(stderr, file=sys.stderr, end="")
+            if not hook.asyncable:
+                report.append(f"Hook Executed: {hook.command}\n")
+            report.append(stderr)
+
+    if blocker is not None and cancelled:
+        names = ", ".join(telemetry.display_name(hook.command) for hook in cancelled)
+        report.append(
+            f"\n[post-tool-use] Cancelled after {telemetry.display_name(blocker.command)} blocked: {names}\n"
+        )
+
+    if skipped:
+        names = ", ".join(telemetry.display_name(hook.command) for hook in skipped)
+        report.append(f"\n[post-tool-use] Skipped after the {DISPATCH_BUDGET_SECONDS:g}s time budget: {names}\n")
 
     exit_code = 0
     if claude_needs_to_know:
         exit_code = 2
 
+    return exit_code, "".join(report)
+
+
+def _serve_daemon() -> int:
+    return daemon.serve(
+        dispatch=dispatch,
+        hook_scripts=python_hook_scripts(),
+        resolve_script=hook_script_path,
+        fallback=execute_hook_async,
+    )
+
+
+async def _main() -> int:
+    tool_name: str | None = None
+    if len(sys.argv) > 1 and sys.argv[1] == "--tool" and len(sys.argv) > 2:
+        tool_name = sys.argv[2]
+
+    stdin_data = sys.stdin.read()
+
+    forwarded = daemon.request_dispatch(stdin_data, tool_name, DISPATCH_BUDGET_SECONDS)
+    if forwarded is not None:
+        exit_code, stderr = forwarded
+    else:
+        exit_code, stderr = await dispatch(stdin_data, tool_name)
+
+    print(stderr, file=sys.stderr, end="")
     return exit_code
 
 
+def _reexec_with_shared_interpreter() -> None:
+    """Restart under the warmed-up interpreter so hook modules import in-process."""
+    python = shared_hook_interpreter()
+    if python is None or sharedenv.is_current_interpreter(python) or os.environ.get("POST_TOOL_USE_REEXEC"):
+        return
+    os.environ["POST_TOOL_USE_REEXEC"] = "1"
+    os.execv(python, [str(python), str(Path(__file__).resolve()), *sys.argv[1:]])
+
+
+def _stats_window(value: str) -> str:
+    """argparse type for --window: checked up front, but kept as written for the report header."""
+    try:
+        telemetry.parse_window(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
 def main() -> int:
-    return asyncio.run(_main())
+    match sys.argv[1:2]:
+        case ["--warmup"]:
+            return sharedenv.warmup(python_hook_scripts())
+        case ["--stats"]:
+            parser = argparse.ArgumentParser(prog=f"{Path(sys.argv[0]).name} --stats")
+            parser.add_argument("--window", type=_stats_window, default=telemetry.DEFAULT_WINDOW)
+            args = parser.parse_args(sys.argv[2:])
+            print(telemetry.format_stats(args.window), end="")
+            return 0
+        case ["--daemon"]:
+            _reexec_with_shared_interpreter()
+            return _serve_daemon()
+        case _:
+            if os.environ.get("POST_TOOL_USE_RUNNING"):
+                return 0
+            # A running daemon already has the hook dependencies loaded
+            if not daemon.SOCKET_PATH.exists():
+                _reexec_with_shared_interpreter()
+            return asyncio.run(_main())
 
 
 if __name__ == "__main__":
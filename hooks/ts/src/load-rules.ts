@@ -1,17 +1,96 @@
-import { readFileSync, existsSync } from "fs";
-import { join, dirname } from "path";
-import type { LanguageRules } from "./types";
+import { execFileSync } from "child_process";
+import { readFileSync, readdirSync, existsSync, realpathSync, statSync } from "fs";
+import { homedir } from "os";
+import { basename, join, dirname } from "path";
+import type { ForbiddenPattern, LanguageRules } from "./types";
 
 const RULES_DIR = join(dirname(dirname(dirname(__dirname))), "rules");
 
+// Compiled by rules/load_rules.py, which validates every rule file against schema.json
+const BUNDLE_PATH =
+  process.env.POST_TOOL_USE_RULES_BUNDLE || join(homedir(), ".claude", "cache", "rules-bundle.json");
+const BUNDLE_VERSION = 2;
+
+interface RulesBundle {
+  version: number;
+  rules_dir: string;
+  sources: Record<string, [number, string]>;
+  extension_map: Record<string, string>;
+  languages: Record<string, LanguageRules>;
+  matchers: Record<
+    string,
+    {
+      excluded_paths: string | null;
+      forbidden_patterns: { regex: string; rule: ForbiddenPattern }[];
+    }
+  >;
+}
+
+export interface CompiledRules {
+  rules: LanguageRules;
+  excludedPaths: RegExp | null;
+  forbiddenPatterns: { regex: RegExp; rule: ForbiddenPattern }[];
+}
+
 const rulesCache = new Map<string, LanguageRules>();
 const extensionMap = new Map<string, string>();
+const compiledCache = new Map<string, CompiledRules>();
+let bundle: RulesBundle | null | undefined;
+
+function sourceSignature(): Record<string, [number, string]> {
+  const sources: Record<string, [number, string]> = {};
+  for (const file of readdirSync(RULES_DIR).filter((name) => name.endsWith(".json")).sort()) {
+    try {
+      const stat = statSync(join(RULES_DIR, file), { bigint: true });
+      sources[file] = [Number(stat.size), stat.mtimeNs.toString()];
+    } catch {
+      continue;
+    }
+  }
+  return sources;
+}
+
+function readBundle(sources: Record<string, [number, string]>): RulesBundle | null {
+  try {
+    const candidate = JSON.parse(readFileSync(BUNDLE_PATH, "utf-8")) as RulesBundle;
+    if (
+      candidate.version === BUNDLE_VERSION &&
+      candidate.rules_dir === realpathSync(RULES_DIR) &&
+      JSON.stringify(candidate.sources) === JSON.stringify(sources)
+    ) {
+      return candidate;
+    }
+  } catch {
+    return null;
+  }
+  return null;
+}
+
+/**
+ * Load the compiled rules bundle with a single read, checked once per process.
+ * A missing or stale bundle is rebuilt by load_rules.py --build; if that fails
+ * (a rule file is invalid, no python3) the per-file loaders below are used.
+ */
+function loadBundle(): RulesBundle | null {
+  if (bundle !== undefined) return bundle;
+
+  const sources = sourceSignature();
+  bundle = readBundle(sources);
+  if (bundle) return bundle;
+
+  try {
+    execFileSync("python3", [join(RULES_DIR, "load_rules.py"), "--build"], { stdio: "ignore", timeout: 10_000 });
+  } catch {
+    return bundle;
+  }
+  bundle = readBundle(sources);
+  return bundle;
+}
 
 function buildExtensionMap(): void {
   if (extensionMap.size > 0) return;
 
-  const fs = require("fs");
-  const files = fs.readdirSync(RULES_DIR) as string[];
+  const files = readdirSync(RULES_DIR);
 
   for (const file of files) {
     if (!file.endsWith(".json") || file === "schema.json") continue;
@@ -31,6 +110,11 @@ function buildExtensionMap(): void {
 }
 
 export function getRules(language: string): LanguageRules | null {
+  const compiled = loadBundle();
+  if (compiled) {
+    return compiled.languages[language] ?? null;
+  }
+
   if (rulesCache.has(language)) {
     return rulesCache.get(language)!;
   }
@@ -51,11 +135,53 @@ export function getRules(language: string): LanguageRules | null {
   }
 }
 
-export function getRulesForFile(filePath: string): LanguageRules | null {
-  buildExtensionMap();
+/**
+ * Same regex as load_rules.excluded_paths_regex: entries with a slash match anywhere
+ * in the path, the rest only within the file name.
+ */
+function excludedPathsRegex(patterns: string[]): string | null {
+  const alternatives = patterns.map((pattern) => {
+    const escaped = pattern.replace(/[\\^$.|?*+()[\]{}/-]/g, "\\$&");
+    return pattern.includes("/") ? escaped : `${escaped}[^/]*$`;
+  });
+  return alternatives.join("|") || null;
+}
+
+export function getCompiledRules(language: string): CompiledRules | null {
+  const cached = compiledCache.get(language);
+  if (cached) return cached;
+
+  const rules = getRules(language);
+  if (!rules) return null;
+
+  const matchers = loadBundle()?.matchers[language];
+  const excludedPaths = matchers
+    ? matchers.excluded_paths
+    : excludedPathsRegex(rules.excluded_paths || []);
+  const forbiddenPatterns = matchers
+    ? matchers.forbidden_patterns
+    : (rules.type_checking?.forbidden_patterns || []).map((rule) => ({ regex: rule.pattern, rule }));
+
+  const compiled: CompiledRules = {
+    rules,
+    excludedPaths: excludedPaths ? new RegExp(excludedPaths) : null,
+    forbiddenPatterns: forbiddenPatterns.map(({ regex, rule }) => ({ regex: new RegExp(regex), rule })),
+  };
+  compiledCache.set(language, compiled);
+  return compiled;
+}
 
+export function getRulesForFile(filePath: string): LanguageRules | null {
   const ext = filePath.substring(filePath.lastIndexOf("."));
 
+  const compiled = loadBundle();
+  if (compiled) {
+    const language = compiled.extension_map[ext];
+    return language ? getRules(language) : null;
+  }
+
+  buildExtensionMap();
+
   const language = extensionMap.get(ext);
   if (!language) return null;
 
@@ -63,10 +189,16 @@ export function getRulesForFile(filePath: string): LanguageRules | null {
 }
 
 export function isExcludedPath(filePath: string, rules: LanguageRules): boolean {
+  const compiled = getCompiledRules(rules.language);
+  if (compiled && compiled.rules === rules) {
+    return compiled.excludedPaths !== null && compiled.excludedPaths.test(filePath);
+  }
+
   const excludedPaths = rules.excluded_paths || [];
+  const name = basename(filePath);
 
   for (const pattern of excludedPaths) {
-    if (filePath.includes(pattern)) {
+    if ((pattern.includes("/") ? filePath : name).includes(pattern)) {
       return true;
     }
   }
@@ -5,6 +5,12 @@ Language rules loader for Claude Code hooks.
 This module provides utilities to load language-specific rules from JSON files
 and use them in hooks for consistent behavior across all language-specific checks.
 
+The rule files are not read one by one: every *.json here is validated against
+schema.json and compiled into a single bundle (extension map, rules per language,
+excluded-path matchers and forbidden-pattern regexes) that both this module and
+hooks/ts/src/load-rules.ts load with one read. The bundle records the size and
+mtime of each source file and is rebuilt as soon as one of them changes.
+
 Usage:
     from load_rules import get_rules, get_rules_for_file
 
@@ -18,45 +24,112 @@ Usage:
     if rules:
         forbidden_types = rules.get("type_checking", {}).get("forbidden_types", [])
         lint_rules = rules.get("linting", {}).get("always_enforce_rules", [])
+
+Build and validate the bundle explicitly (exits 1 if a rule file is invalid):
+    python load_rules.py --build
 """
 
 from __future__ import annotations
 
+import contextlib
 import json
-from functools import lru_cache
+import os
+import re
+import tempfile
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 RULES_DIR = Path(__file__).parent
+SCHEMA_FILE = "schema.json"
+BUNDLE_PATH = Path(
+    os.environ.get("POST_TOOL_USE_RULES_BUNDLE", Path.home() / ".claude" / "cache" / "rules-bundle.json")
+)
+BUNDLE_VERSION = 2
 EXTENSION_TO_LANGUAGE: dict[str, str] = {}
-_rules_cache: dict[str, dict[str, Any]] = {}
 
+# Escaped the same way for Python's re and JavaScript's RegExp, which share the bundle
+_REGEX_SPECIAL = re.compile(r"[\\^$.|?*+()\[\]{}/-]")
+_JSON_TYPES: dict[str, tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+}
 
-def _build_extension_map() -> None:
-    """Build mapping from file extensions to language names."""
-    global EXTENSION_TO_LANGUAGE
+_bundle: dict[str, Any] | None = None
+_bundle_dir_mtime: int | None = None
+_compiled: dict[str, CompiledRules] = {}
 
-    if EXTENSION_TO_LANGUAGE:
-        return
 
-    for rule_file in RULES_DIR.glob("*.json"):
-        if rule_file.name == "schema.json":
-            continue
+class RulesValidationError(ValueError):
+    """A rule file does not match schema.json or holds a pattern that does not compile."""
 
-        try:
-            with open(rule_file, encoding="utf-8") as f:
-                rules = json.load(f)
 
-            language = rules.get("language", rule_file.stem)
-            extensions = rules.get("extensions", [])
+class CompiledRules(NamedTuple):
+    rules: dict[str, Any]
+    excluded_paths: re.Pattern[str] | None
+    forbidden_patterns: list[tuple[re.Pattern[str], dict[str, str]]]
 
-            for ext in extensions:
-                EXTENSION_TO_LANGUAGE[ext] = language
-        except (json.JSONDecodeError, OSError):
-            continue
+
+def build_bundle() -> dict[str, Any]:
+    """Validate every rule file and write the compiled bundle.
+
+    Returns:
+        The bundle that was written
+
+    Raises:
+        RulesValidationError: If a rule file is invalid; nothing is written then
+    """
+    bundle, errors = _compile_bundle()
+    if errors:
+        raise RulesValidationError("\n".join(errors))
+    _write_bundle(bundle)
+    return bundle
+
+
+def load_bundle() -> dict[str, Any]:
+    """Return the current bundle, rebuilding it if any source file changed.
+
+    The source files are compared once per process and afterwards only when the
+    rules directory's mtime moves (a rule file added, removed or saved by
+    rename); the dispatcher daemon restarts on any rule file change instead.
+
+    Rule files that fail validation are still loaded, as they always were, but
+    such a bundle is only kept in memory so the next process validates again.
+    """
+    global _bundle, _bundle_dir_mtime
+
+    dir_mtime = _dir_mtime()
+    if _bundle is not None and dir_mtime == _bundle_dir_mtime:
+        return _bundle
+
+    sources = _source_signature()
+    if _bundle is not None and _bundle["sources"] == sources:
+        _bundle_dir_mtime = dir_mtime
+        return _bundle
+
+    bundle = _read_bundle()
+    if bundle is None or bundle.get("sources") != sources:
+        bundle, errors = _compile_bundle()
+        if not errors:
+            _write_bundle(bundle)
+
+    _bundle = bundle
+    _bundle_dir_mtime = dir_mtime
+    _compiled.clear()
+    EXTENSION_TO_LANGUAGE.clear()
+    EXTENSION_TO_LANGUAGE.update(bundle["extension_map"])
+    return bundle
+
+
+def _build_extension_map() -> None:
+    """Build mapping from file extensions to language names."""
+    load_bundle()
 
 
-@lru_cache(maxsize=32)
 def get_rules(language: str) -> dict[str, Any] | None:
     """Load rules for a specific language.
 
@@ -66,22 +139,58 @@ def get_rules(language: str) -> dict[str, Any] | None:
     Returns:
         Dictionary containing language rules, or None if not found
     """
-    if language in _rules_cache:
-        return _rules_cache[language]
+    return load_bundle()["languages"].get(language)
 
-    rule_file = RULES_DIR / f"{language}.json"
 
-    if not rule_file.exists():
-        return None
+def get_compiled_rules(language: str) -> CompiledRules | None:
+    """Load rules for a language together with its compiled matchers.
 
-    try:
-        with open(rule_file, encoding="utf-8") as f:
-            rules = json.load(f)
-        _rules_cache[language] = rules
-        return rules
-    except (json.JSONDecodeError, OSError):
+    Args:
+        language: Language name (e.g., 'python', 'typescript')
+
+    Returns:
+        The rules with their excluded-path and forbidden-pattern regexes, or None if not found
+    """
+    bundle = load_bundle()
+    if language in _compiled:
+        return _compiled[language]
+
+    rules = bundle["languages"].get(language)
+    if rules is None:
         return None
 
+    matchers = bundle["matchers"][language]
+    excluded_paths = matchers["excluded_paths"]
+    compiled = CompiledRules(
+        rules=rules,
+        excluded_paths=re.compile(excluded_paths) if excluded_paths else None,
+        forbidden_patterns=[
+            (re.compile(pattern["regex"]), pattern["rule"]) for pattern in matchers["forbidden_patterns"]
+        ],
+    )
+    _compiled[language] = compiled
+    return compiled
+
+
+def excluded_paths_regex(patterns: Iterable[str]) -> str | None:
+    """Build the excluded-path regex the bundle stores.
+
+    Entries containing a slash ('/tests/') match anywhere in the path; the rest
+    ('test_', '_test.py') only within the file name, so a directory such as
+    latest_app/ does not exclude everything below it.
+
+    Args:
+        patterns: excluded_paths entries (e.g., '/tests/', 'test_')
+
+    Returns:
+        A regex valid for both Python and JavaScript, or None if there are no entries
+    """
+    alternatives: list[str] = []
+    for pattern in patterns:
+        escaped = _REGEX_SPECIAL.sub(r"\\\g<0>", pattern)
+        alternatives.append(escaped if "/" in pattern else f"{escaped}[^/]*$")
+    return "|".join(alternatives) or None
+
 
 def get_rules_for_file(file_path: str) -> dict[str, Any] | None:
     """Load rules based on file extension.
@@ -114,10 +223,15 @@ def is_excluded_path(file_path: str, rules: dict[str, Any]) -> bool:
     Returns:
         True if path should be excluded
     """
+    compiled = get_compiled_rules(rules.get("language", ""))
+    if compiled is not None and compiled.rules is rules:
+        return compiled.excluded_paths is not None and compiled.excluded_paths.search(file_path) is not None
+
     excluded_paths = rules.get("excluded_paths", [])
+    name = Path(file_path).name
 
     for pattern in excluded_paths:
-        if pattern in file_path:
+        if pattern in (file_path if "/" in pattern else name):
             return True
 
     return False
@@ -234,15 +348,172 @@ def get_forbidden_patterns(rules: dict[str, Any]) -> list[dict[str, str]]:
 
 def clear_cache() -> None:
     """Clear all cached rules."""
-    global _rules_cache, EXTENSION_TO_LANGUAGE
-    _rules_cache.clear()
+    global _bundle, _bundle_dir_mtime
+    _bundle = None
+    _bundle_dir_mtime = None
+    _compiled.clear()
     EXTENSION_TO_LANGUAGE.clear()
-    get_rules.cache_clear()
+
+
+def _dir_mtime() -> int | None:
+    try:
+        return RULES_DIR.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _source_signature() -> dict[str, list[Any]]:
+    """(size, mtime_ns) of every rule file and the schema; mtime_ns as a string so JavaScript keeps it exact."""
+    sources: dict[str, list[Any]] = {}
+    for rule_file in sorted(RULES_DIR.glob("*.json")):
+        with contextlib.suppress(OSError):
+            stat = rule_file.stat()
+            sources[rule_file.name] = [stat.st_size, str(stat.st_mtime_ns)]
+    return sources
+
+
+def _compile_bundle() -> tuple[dict[str, Any], list[str]]:
+    """Compile every rule file into a bundle, collecting validation errors instead of stopping at them."""
+    # Taken before reading, so an edit made meanwhile leaves the bundle stale rather than wrong
+    sources = _source_signature()
+    errors: list[str] = []
+
+    try:
+        schema = json.loads((RULES_DIR / SCHEMA_FILE).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        schema = {}
+        errors.append(f"{SCHEMA_FILE}: {e}")
+
+    bundle: dict[str, Any] = {
+        "version": BUNDLE_VERSION,
+        "rules_dir": os.path.realpath(RULES_DIR),
+        "sources": sources,
+        "extension_map": {},
+        "languages": {},
+        "matchers": {},
+    }
+
+    for name in sources:
+        if name == SCHEMA_FILE:
+            continue
+
+        try:
+            rules = json.loads((RULES_DIR / name).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            errors.append(f"{name}: {e}")
+            continue
+
+        errors.extend(_schema_errors(rules, schema, name))
+        if not isinstance(rules, dict):
+            continue
+
+        language = rules.get("language", Path(name).stem)
+        bundle["languages"][language] = rules
+        for ext in _strings(rules.get("extensions")):
+            bundle["extension_map"][ext] = language
+
+        type_checking = rules.get("type_checking")
+        patterns = type_checking.get("forbidden_patterns") if isinstance(type_checking, dict) else None
+        forbidden_patterns: list[dict[str, Any]] = []
+        for i, pattern in enumerate(patterns if isinstance(patterns, list) else []):
+            try:
+                re.compile(pattern["pattern"])
+            except (re.error, KeyError, TypeError) as e:
+                errors.append(f"{name}.type_checking.forbidden_patterns[{i}]: {e}")
+                continue
+            forbidden_patterns.append({"regex": pattern["pattern"], "rule": pattern})
+
+        bundle["matchers"][language] = {
+            "excluded_paths": excluded_paths_regex(_strings(rules.get("excluded_paths"))),
+            "forbidden_patterns": forbidden_patterns,
+        }
+
+    return bundle, errors
+
+
+def _strings(value: Any) -> list[str]:
+    return [item for item in value if isinstance(item, str)] if isinstance(value, list) else []
+
+
+def _schema_errors(value: Any, schema: dict[str, Any], location: str) -> list[str]:
+    """Check value against the subset of JSON Schema that schema.json uses."""
+    expected = schema.get("type")
+    expected_types = [expected] if isinstance(expected, str) else expected or []
+    if expected_types and not any(_is_json_type(value, name) for name in expected_types):
+        return [f"{location}: expected {' or '.join(expected_types)}, got {type(value).__name__}"]
+
+    errors: list[str] = []
+    if isinstance(value, dict):
+        errors.extend(f"{location}: missing required '{key}'" for key in schema.get("required", []) if key not in value)
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties")
+        for key, item in value.items():
+            if key in properties:
+                errors.extend(_schema_errors(item, properties[key], f"{location}.{key}"))
+            elif isinstance(additional, dict):
+                errors.extend(_schema_errors(item, additional, f"{location}.{key}"))
+            elif additional is False:
+                errors.append(f"{location}: unexpected property '{key}'")
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        for i, item in enumerate(value):
+            errors.extend(_schema_errors(item, schema["items"], f"{location}[{i}]"))
+    return errors
+
+
+def _is_json_type(value: Any, name: str) -> bool:
+    if name not in _JSON_TYPES:
+        return True
+    # bool is an int subclass in Python but never a JSON number
+    return isinstance(value, _JSON_TYPES[name]) and (name == "boolean" or not isinstance(value, bool))
+
+
+def _read_bundle() -> dict[str, Any] | None:
+    try:
+        bundle = json.loads(BUNDLE_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    match bundle:
+        case {
+            "version": version,
+            "rules_dir": str(rules_dir),
+            "sources": dict(),
+            "extension_map": dict(),
+            "languages": dict(),
+            "matchers": dict(),
+        } if version == BUNDLE_VERSION and rules_dir == os.path.realpath(RULES_DIR):
+            return bundle
+        case _:
+            return None
+
+
+def _write_bundle(bundle: dict[str, Any]) -> None:
+    """Write the bundle atomically; a failed write only means the next load compiles again."""
+    data = json.dumps(bundle, separators=(",", ":"), ensure_ascii=False)
+
+    with contextlib.suppress(OSError):
+        BUNDLE_PATH.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        fd, temp_path = tempfile.mkstemp(dir=BUNDLE_PATH.parent, prefix=".rules-bundle-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, BUNDLE_PATH)
+        except OSError:
+            Path(temp_path).unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
     import sys
 
+    if sys.argv[1:] == ["--build"]:
+        try:
+            built = build_bundle()
+        except RulesValidationError as e:
+            print(f"Invalid language rules:\n{e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Wrote {BUNDLE_PATH} ({', '.join(sorted(built['languages']))})")
+        sys.exit(0)
+
     print("Available language rules:")
     for rule_file in RULES_DIR.glob("*.json"):
         if rule_file.name != "schema.json":